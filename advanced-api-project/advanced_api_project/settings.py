@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
+from importlib.util import find_spec
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -43,6 +45,10 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Outermost after security: compresses what the rest produce
+    'api.compression.CompressionMiddleware',
+    # Before anything that reads the database
+    'api.router.ReplicaPinningMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -81,6 +87,20 @@ DATABASES = {
     }
 }
 
+# Reads go to DATABASE_REPLICAS, writes to `default` (see api/router.py).
+# Locally, DJANGO_DB_REPLICA=1 adds a stand-in replica: a copy of
+# db.sqlite3 kept fresh by `python manage.py refresh_replica --interval 2`.
+if os.environ.get('DJANGO_DB_REPLICA'):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.replica.sqlite3',
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['api.router.ReplicaRouter']
+# After a client's write, its reads stay on the primary this long (seconds)
+DATABASE_PIN_SECONDS = 5
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -123,11 +143,122 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+#
+# Book read endpoints cache their responses here (see api/cache.py).
+# To share the cache between worker processes, switch to the
+# file-based backend:
+#   'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+#   'LOCATION': BASE_DIR / 'cache',
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'advanced-api-project',
+    }
+}
+
+API_CACHE_ALIAS = 'default'
+API_CACHE_TIMEOUT = 300  # seconds
+
+# Bulk book creation (POST a JSON array to /api/books/create/)
+API_BULK_BATCH_SIZE = 500  # rows per INSERT
+API_BULK_MAX_ITEMS = 10000  # books per request
+
+# Most ids per batch lookup (/api/books/?ids=1,2,3 and /api/books/batch/)
+API_BATCH_MAX_IDS = 500
+
+# Rows fetched per query by /api/books/export/
+API_EXPORT_CHUNK_SIZE = 2000
+
+# Newest books nested per author in /api/authors/
+API_AUTHOR_BOOKS_LIMIT = 10
+
+# Response compression (see api/compression.py). zstd and br are offered
+# when the zstandard / brotli packages are installed, gzip always.
+API_COMPRESSION_MIN_SIZE = 1024  # bytes
+API_COMPRESSION_LEVELS = {'gzip': 6, 'br': 5, 'zstd': 3}
+
+# Book write events (api.books) are logged as JSON lines. The views
+# only enqueue records; the `queue` handler's listener thread writes
+# them to the handlers listed under it (see api/log.py).
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {'()': 'api.log.JsonFormatter'},
+    },
+    'handlers': {
+        'json_console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'json',
+        },
+        'queue': {
+            '()': 'api.log.QueueListenerHandler',
+            'handlers': ['cfg://handlers.json_console'],
+        },
+    },
+    'loggers': {
+        'api': {
+            'handlers': ['queue'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
+# Keeps `manage.py test` output clean by muting the `api` logger's
+# handlers during the run (see api/runner.py)
+TEST_RUNNER = 'api.runner.QuietLogTestRunner'
+
+# Rebuild each process's title autocomplete index when older than this
+# many seconds, to pick up writes handled by other processes (None: never)
+API_AUTOCOMPLETE_REFRESH = 300
+
+# Extra tokens charged by the throttle for expensive query parameters
+# (a plain request costs 1; see api/throttling.py)
+API_THROTTLE_QUERY_COSTS = {'search': 4, 'ordering': 1}
+
+# API_THROTTLE_ENABLED=0 turns every throttle off, e.g. on a server
+# under load test (benchmark_http starts its runserver that way)
+API_THROTTLE_ENABLED = os.environ.get('API_THROTTLE_ENABLED', '1') != '0'
+
 REST_FRAMEWORK = {
+    # MessagePack is added below when the msgpack package is installed
+    'DEFAULT_RENDERER_CLASSES': [
+        'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
-    ]
+    ],
+    # Token buckets per view `throttle_scope` and user (or IP):
+    # '<capacity>/<period>', refilled at that rate
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.throttling.TokenBucketThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'book-list': '120/min',
+        'book-detail': '300/min',
+        'book-export': '10/min',
+        'book-autocomplete': '600/min',
+        'book-write': '60/min',
+        'author-list': '120/min',
+        'author-detail': '300/min',
+    },
 }
 
+# Binary MessagePack bodies (Accept / Content-Type: application/msgpack)
+# for service clients; see api/messagepack.py
+if find_spec('msgpack') is not None:
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].append('api.messagepack.MessagePackRenderer')
+    REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'].append('api.messagepack.MessagePackParser')
+
@@ -0,0 +1,143 @@
+import json
+import logging
+import time
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from .fast import FastRepresentation
+from .models import Author, Book
+from .search import FTS5SearchFilter, RelevanceOrderingFilter
+from .serializers import AuthorField, BookSerializer
+from .views import BookListView
+
+logger = logging.getLogger('api.books')
+
+
+# ---------------------------------------------------------
+# Async (ASGI) book views
+# ---------------------------------------------------------
+# Native `async def` counterparts of BookListView, BookDetailView
+# and BookCreateView. Every database round trip goes through
+# Django's async ORM (async iteration, aget, afirst, acreate), so
+# under the ASGI entry point (advanced_api_project/asgi.py) a request
+# waiting on the database does not hold a worker thread.
+#
+# They return the same JSON as their DRF counterparts and reuse
+# the same building blocks:
+# - filters: exact ?title= / ?publication_year= / ?author=
+# - search: FTS5SearchFilter (?search=), ranked by relevance
+# - ordering: RelevanceOrderingFilter (?ordering=)
+# - pagination: BookCursorPagination (?cursor=, ?page_size=)
+# - serialization: the fast read path (api/fast.py)
+#
+# Not supported here: ?count=, ?facets=, ?fields=, the response
+# cache and conditional GETs. Creating requires a session login.
+def _json(data, status=200):
+    return HttpResponse(JSONRenderer().render(data), content_type='application/json', status=status)
+
+
+def _list_view(request):
+    # A BookListView instance provides search_fields, ordering_fields
+    # etc. to the DRF filter backends; it never touches the database.
+    view = BookListView()
+    view.request = Request(request)
+    view.args, view.kwargs, view.format_kwarg = (), {}, None
+    return view
+
+
+def _exact_filters(params, names):
+    # Same lookups as DjangoFilterBackend with `filterset_fields`, but
+    # without the author existence check (a sync query)
+    lookups, errors = {}, {}
+    for name in names:
+        value = params.get(name)
+        if not value:
+            continue
+        field = Book._meta.get_field(name)
+        target = field.target_field if field.is_relation else field
+        try:
+            lookups[field.attname] = target.to_python(value)
+        except DjangoValidationError as exc:
+            errors[name] = exc.messages
+    return lookups, errors
+
+
+@require_GET
+async def book_list(request):
+    view = _list_view(request)
+    fast = FastRepresentation.for_serializer(BookSerializer)
+
+    lookups, errors = _exact_filters(request.GET, view.filterset_fields)
+    if errors:
+        return _json(errors, status=400)
+    queryset = Book.objects.filter(**lookups)
+    for backend in (FTS5SearchFilter, RelevanceOrderingFilter):
+        queryset = backend().filter_queryset(view.request, queryset, view)
+
+    paginator = view.paginator
+    columns = list(fast.columns)
+    columns += [column for column in paginator.get_row_columns(view.request, queryset, view) if column not in columns]
+    page = await paginator.apaginate_queryset(queryset.values(*columns), view.request, view)
+    return _json(paginator.get_paginated_data(fast.serialize(page)))
+
+
+@require_GET
+async def book_detail(request, pk):
+    fast = FastRepresentation.for_serializer(BookSerializer)
+    try:
+        row = await Book.objects.values(*fast.columns).aget(pk=pk)
+    except Book.DoesNotExist:
+        return _json({'detail': 'No Book matches the given query.'}, status=404)
+    return _json(fast.serialize([row])[0])
+
+
+@require_POST
+async def book_create(request):
+    user = await request.auser()
+    if not user.is_authenticated:
+        return _json({'detail': 'Authentication credentials were not provided.'}, status=403)
+
+    if request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body)
+        except ValueError:
+            return _json({'detail': 'JSON parse error.'}, status=400)
+        if not isinstance(data, dict):
+            return _json({'detail': 'Expected a JSON object.'}, status=400)
+    else:
+        data = request.POST.dict()
+
+    # Resolve the author here, asynchronously, and hand it to the
+    # serializer through the context (see AuthorField) so validation
+    # itself never queries the database.
+    authors = {}
+    raw_author = data.get('author')
+    if raw_author is not None:
+        try:
+            author_pk = int(raw_author)
+        except (TypeError, ValueError):
+            message = AuthorField.default_error_messages['incorrect_type']
+            return _json({'author': [message.format(data_type=type(raw_author).__name__)]}, status=400)
+        author = await Author.objects.filter(pk=author_pk).afirst()
+        if author is None:
+            message = AuthorField.default_error_messages['does_not_exist']
+            return _json({'author': [message.format(pk_value=raw_author)]}, status=400)
+        authors[author_pk] = author
+
+    serializer = BookSerializer(data=data, context={'authors': authors})
+    if not serializer.is_valid():
+        return _json(serializer.errors, status=400)
+
+    started = time.perf_counter()
+    book = await Book.objects.acreate(**serializer.validated_data)
+    save_ms = (time.perf_counter() - started) * 1000
+    logger.info('book.created', extra={'event': {
+        'book_id': book.pk,
+        'fields': sorted(serializer.validated_data),
+        'save_ms': round(save_ms, 3),
+    }})
+    return _json(BookSerializer(book).data, status=201)
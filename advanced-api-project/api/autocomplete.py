@@ -0,0 +1,144 @@
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.db import connection
+
+
+# ------------------------------------------------
+# Title autocomplete index
+# ------------------------------------------------
+# An in-process, sorted list of (normalized title, book id). A prefix
+# query is one binary search plus a short forward scan, so answering
+# it never touches the database.
+#
+# - Built from the database on first use (not in AppConfig.ready(),
+#   where the tables may not exist yet, e.g. during migrate).
+# - Kept up to date by the Book post_save/post_delete receivers in
+#   models.py, applied on commit, and by explicit put() calls on the
+#   bulk paths that send no signals (same places that update the
+#   search index).
+# - Each server process has its own copy and only sees the writes it
+#   handles itself. With several worker processes, set
+#   API_AUTOCOMPLETE_REFRESH (seconds) so stale copies are rebuilt in
+#   a background thread while the old copy keeps answering.
+def normalize(title):
+    """Case- and accent-insensitive form used for matching."""
+    decomposed = unicodedata.normalize('NFKD', title)
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(stripped.casefold().split())
+
+
+class TitleIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._entries = []  # sorted (normalized title, id)
+        self._titles = {}  # id -> (normalized title, title)
+        self._built_at = None
+        self._pending = None  # changes made while a rebuild runs
+
+    # ---------------------------------------------------
+    # Queries
+    # ---------------------------------------------------
+    def search(self, prefix, limit=10):
+        """Return up to `limit` (id, title) pairs whose title starts with `prefix`."""
+        self.ensure_built()
+        prefix = normalize(prefix)
+        if not prefix or limit < 1:
+            return []
+
+        results = []
+        with self._lock:
+            entries, titles = self._entries, self._titles
+            position = bisect_left(entries, (prefix,))
+            while position < len(entries) and len(results) < limit:
+                key, pk = entries[position]
+                if not key.startswith(prefix):
+                    break
+                results.append((pk, titles[pk][1]))
+                position += 1
+        return results
+
+    def __len__(self):
+        return len(self._titles)
+
+    # ---------------------------------------------------
+    # Updates
+    # ---------------------------------------------------
+    def put(self, rows):
+        """Add or replace (id, title) rows."""
+        with self._lock:
+            if self._built_at is None:
+                return  # the first query reads everything anyway
+            if self._pending is not None:
+                self._pending.append(('put', list(rows)))
+                return
+            for pk, title in rows:
+                self._discard(pk)
+                entry = (normalize(title), pk)
+                insort(self._entries, entry)
+                self._titles[pk] = (entry[0], title)
+
+    def remove(self, ids):
+        with self._lock:
+            if self._built_at is None:
+                return
+            if self._pending is not None:
+                self._pending.append(('remove', list(ids)))
+                return
+            for pk in ids:
+                self._discard(pk)
+
+    def _discard(self, pk):
+        old = self._titles.pop(pk, None)
+        if old is not None:
+            position = bisect_left(self._entries, (old[0], pk))
+            del self._entries[position]
+
+    # ---------------------------------------------------
+    # (Re)building
+    # ---------------------------------------------------
+    def ensure_built(self):
+        refresh = getattr(settings, 'API_AUTOCOMPLETE_REFRESH', None)
+        with self._lock:
+            if self._built_at is None:
+                self._build()
+                return
+            stale = refresh is not None and time.monotonic() - self._built_at > refresh
+            if not stale or self._pending is not None:
+                return
+            self._pending = []
+        threading.Thread(target=self._background_build, daemon=True).start()
+
+    def reset(self):
+        with self._lock:
+            self._entries, self._titles = [], {}
+            self._built_at = None
+            self._pending = None
+
+    def _background_build(self):
+        try:
+            self._build()
+        finally:
+            connection.close()  # this thread's connection
+
+    def _build(self):
+        from .models import Book
+
+        titles = {
+            pk: (normalize(title), title)
+            for pk, title in Book.objects.values_list('id', 'title').iterator(chunk_size=10000)
+        }
+        entries = sorted((key, pk) for pk, (key, _) in titles.items())
+        with self._lock:
+            self._entries, self._titles = entries, titles
+            self._built_at = time.monotonic()
+            pending, self._pending = self._pending or [], None
+            # Replay the writes that happened while reading
+            for action, items in pending:
+                getattr(self, action)(items)
+
+
+index = TitleIndex()
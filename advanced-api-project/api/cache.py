@@ -0,0 +1,159 @@
+import hashlib
+import time
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.response import Response
+
+from .router import pin_seconds, use_primary
+
+
+# ------------------------------------------------
+# Versioned response cache
+# ------------------------------------------------
+# Read endpoints cache their response data under a key made of:
+#   - the view class and URL kwargs (e.g. pk)
+#   - the normalized query params (filters, search, ordering, cursor...)
+#   - the current version counter of the model the view serves
+#
+# Write endpoints call `bump_version(Book)` after saving. Every key
+# built afterwards contains the new version, so old entries are simply
+# never read again and age out with the cache timeout. No key scanning
+# is needed, which keeps this working on the local-memory and
+# file-based backends.
+#
+# Settings:
+#   API_CACHE_ALIAS    cache alias to use (default: 'default')
+#   API_CACHE_TIMEOUT  seconds an entry lives (default: 300)
+KEY_PREFIX = 'api'
+
+
+def get_cache():
+    return caches[getattr(settings, 'API_CACHE_ALIAS', 'default')]
+
+
+def _version_key(model):
+    return f'{KEY_PREFIX}:version:{model._meta.label_lower}'
+
+
+def _initial_version():
+    # Counters start from the clock rather than 1: if a counter is ever
+    # evicted, the restarted one is still above any version in use.
+    return time.time_ns() // 1000
+
+
+def get_version(model):
+    cache = get_cache()
+    key = _version_key(model)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _initial_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def _modified_key(model):
+    return f'{KEY_PREFIX}:modified:{model._meta.label_lower}'
+
+
+def bump_version(model):
+    cache = get_cache()
+    key = _version_key(model)
+    cache.set(_modified_key(model), time.time(), timeout=None)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = _initial_version()
+        cache.set(key, version, timeout=None)
+        return version
+
+
+def get_last_modified(model):
+    """Unix time of the last `bump_version(model)`, or None if unknown."""
+    return get_cache().get(_modified_key(model))
+
+
+def _count(view_name, outcome):
+    cache = get_cache()
+    key = f'{KEY_PREFIX}:stats:{view_name}:{outcome}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+
+
+def get_stats(view_names):
+    """Return {view_name: {'hits': n, 'misses': n}} for the given views."""
+    cache = get_cache()
+    return {
+        name: {
+            'hits': cache.get(f'{KEY_PREFIX}:stats:{name}:hit', 0),
+            'misses': cache.get(f'{KEY_PREFIX}:stats:{name}:miss', 0),
+        }
+        for name in view_names
+    }
+
+
+def response_cache_key(view, request, version):
+    # Sort params and their values so ?a=1&b=2 and ?b=2&a=1 share an entry
+    params = sorted(
+        (name, sorted(request.query_params.getlist(name)))
+        for name in request.query_params
+    )
+    kwargs = sorted(view.kwargs.items())
+    raw = repr((request.get_host(), params, kwargs))
+    digest = hashlib.md5(raw.encode('utf-8')).hexdigest()
+    return f'{KEY_PREFIX}:response:{type(view).__name__}:v{version}:{digest}'
+
+
+# ------------------------------------------------
+# CachedResponseMixin
+# ------------------------------------------------
+# Add in front of a generic read view to serve GETs from the cache.
+# The view's queryset model provides the version counter; set
+# `cache_model` to track another model instead.
+#
+# Responses carry an `X-Cache: HIT` / `X-Cache: MISS` header, and
+# totals per view are available from `get_stats()`. Both also carry
+# a `compression_key`, so CompressionMiddleware can reuse the
+# compressed body (see api/compression.py).
+class CachedResponseMixin:
+    cache_model = None
+
+    def get_cache_model(self):
+        return self.cache_model or self.queryset.model
+
+    def get(self, request, *args, **kwargs):
+        cache = get_cache()
+        view_name = type(self).__name__
+        key = response_cache_key(self, request, get_version(self.get_cache_model()))
+
+        data = cache.get(key)
+        if data is not None:
+            _count(view_name, 'hit')
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            response.compression_key = self.get_compression_key(request, key)
+            return response
+
+        _count(view_name, 'miss')
+        # Right after a write the replicas may still lag behind: build
+        # the entry for the new version from the primary.
+        modified = get_last_modified(self.get_cache_model())
+        recent_write = modified is not None and time.time() - modified < pin_seconds()
+        with use_primary() if recent_write else nullcontext():
+            response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            timeout = getattr(settings, 'API_CACHE_TIMEOUT', 300)
+            cache.set(key, response.data, timeout)
+            response.compression_key = self.get_compression_key(request, key)
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def get_compression_key(self, request, key):
+        # Same data renders to the same bytes for the same media type
+        # (incl. parameters such as `indent`); CompressionMiddleware
+        # stores the compressed body under this key.
+        media_type = hashlib.md5(str(request.accepted_media_type).encode('utf-8')).hexdigest()[:12]
+        return f'{key}:{media_type}'
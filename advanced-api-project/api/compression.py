@@ -0,0 +1,152 @@
+import gzip
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_sequence
+
+from .cache import get_cache
+
+# Optional encoders: used when the package is installed
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    from compression import zstd  # Python 3.14+
+except ImportError:
+    try:
+        import zstandard as zstd
+    except ImportError:
+        zstd = None
+
+
+def _zstd_compress(data, level):
+    if hasattr(zstd, 'ZstdCompressor'):  # zstandard package
+        return zstd.ZstdCompressor(level=level).compress(data)
+    return zstd.compress(data, level=level)
+
+
+# Content-Encoding -> compress(data, level), in order of preference
+# when a client accepts several equally.
+ENCODERS = {}
+if zstd is not None:
+    ENCODERS['zstd'] = _zstd_compress
+if brotli is not None:
+    ENCODERS['br'] = lambda data, level: brotli.compress(data, quality=level)
+ENCODERS['gzip'] = lambda data, level: gzip.compress(data, compresslevel=level, mtime=0)
+
+DEFAULT_LEVELS = {'zstd': 3, 'br': 5, 'gzip': 6}
+
+# Only API formats. HTML (the browsable API, admin) is left alone:
+# its pages carry CSRF tokens next to reflected input, the setting
+# for BREACH-style attacks on compressed responses.
+DEFAULT_TYPES = ('application/json', 'application/msgpack', 'application/x-ndjson', 'text/csv')
+
+
+def parse_accept_encoding(header):
+    """Return {coding: q} from an Accept-Encoding header."""
+    qualities = {}
+    for item in header.split(','):
+        coding, _, params = item.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    return qualities
+
+
+def choose_encoding(header, available):
+    """Pick the accepted encoding with the highest q; ties go to `available` order."""
+    qualities = parse_accept_encoding(header)
+    best, best_quality = None, 0.0
+    for coding in available:
+        quality = qualities.get(coding, qualities.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+# ------------------------------------------------
+# CompressionMiddleware
+# ------------------------------------------------
+# Compresses API responses with the best encoding the client accepts:
+# zstd and brotli when their packages are installed, gzip always.
+#
+# - Only responses of at least API_COMPRESSION_MIN_SIZE bytes and of
+#   a type in API_COMPRESSION_TYPES; smaller payloads gain too little
+#   to pay for the CPU and the Content-Encoding header.
+# - Streamed responses (the export view) are gzipped on the fly.
+# - Strong ETags become weak, as with Django's GZipMiddleware, so
+#   If-None-Match keeps matching.
+#
+# Responses served by CachedResponseMixin carry a `compression_key`
+# (the response cache key plus the accepted media type). The compressed
+# bytes are stored under it for each encoding, so a response that is
+# served from the cache is compressed once per version rather than
+# on every hit.
+#
+# Settings:
+#   API_COMPRESSION_MIN_SIZE   bytes (default: 1024)
+#   API_COMPRESSION_LEVELS     {'gzip': 6, 'br': 5, 'zstd': 3}
+#   API_COMPRESSION_TYPES      media types to compress
+#   API_COMPRESSION_ENCODINGS  encodings to offer (default: all available)
+class CompressionMiddleware(MiddlewareMixin):
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding'):
+            return response
+        media_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        if media_type not in getattr(settings, 'API_COMPRESSION_TYPES', DEFAULT_TYPES):
+            return response
+        if not response.streaming and len(response.content) < getattr(settings, 'API_COMPRESSION_MIN_SIZE', 1024):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        offered = getattr(settings, 'API_COMPRESSION_ENCODINGS', None)
+        available = [coding for coding in ENCODERS if offered is None or coding in offered]
+        accept = request.META.get('HTTP_ACCEPT_ENCODING', '')
+
+        if response.streaming:
+            if response.is_async or 'gzip' not in available or choose_encoding(accept, ['gzip']) is None:
+                return response
+            response.streaming_content = compress_sequence(response.streaming_content)
+            del response.headers['Content-Length']
+            coding = 'gzip'
+        else:
+            coding = choose_encoding(accept, available)
+            if coding is None:
+                return response
+            content = self.compress(coding, response.content, getattr(response, 'compression_key', None))
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response.headers['Content-Length'] = str(len(content))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = coding
+        return response
+
+    def compress(self, coding, content, key=None):
+        level = {**DEFAULT_LEVELS, **getattr(settings, 'API_COMPRESSION_LEVELS', {})}[coding]
+        if key is None:
+            return ENCODERS[coding](content, level)
+
+        cache = get_cache()
+        key = f'{key}:{coding}{level}'
+        compressed = cache.get(key)
+        if compressed is None:
+            compressed = ENCODERS[coding](content, level)
+            cache.set(key, compressed, getattr(settings, 'API_CACHE_TIMEOUT', 300))
+        return compressed
@@ -0,0 +1,42 @@
+import csv
+import json
+
+from rest_framework.utils.encoders import JSONEncoder
+
+
+# ------------------------------------------------
+# Streaming export
+# ------------------------------------------------
+# Generators turning an iterator of dicts into NDJSON lines or CSV
+# rows, one chunk at a time. Used with StreamingHttpResponse so the
+# full catalog is never held in memory.
+class _Echo:
+    # File-like object for csv.writer: hands each row straight back
+    def write(self, value):
+        return value
+
+
+def ndjson_lines(rows):
+    encoder = JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    for row in rows:
+        yield encoder.encode(row) + '\n'
+
+
+def csv_lines(rows, columns):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([row[column] for column in columns])
+
+
+EXPORT_FORMATS = {
+    # name: (content type, file extension)
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'csv': ('text/csv', 'csv'),
+}
+
+
+def export_lines(export_format, rows, columns):
+    if export_format == 'csv':
+        return csv_lines(rows, columns)
+    return ndjson_lines(rows)
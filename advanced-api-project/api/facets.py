@@ -0,0 +1,69 @@
+from django.db.models import Count
+from rest_framework.exceptions import ValidationError
+
+
+# ------------------------------------------------
+# FacetsMixin
+# ------------------------------------------------
+# Adds per-value counts for the current filtered / searched queryset
+# to a paginated list response:
+#   ?facets=publication_year,author
+#   -> "facets": {
+#          "publication_year": [{"value": 1951, "count": 12}, ...],
+#          "author": [{"value": 3, "label": "Isaac Asimov", "count": 40}, ...]
+#      }
+#
+# Each facet is ONE grouped query (GROUP BY the facet column), capped
+# to the `facet_limit` most frequent values. Facets are part of the
+# response data, so the response cache stores them with the page.
+#
+# `facet_fields` maps a facet name to its model field and an optional
+# label field (fetched in the same grouped query).
+class FacetsMixin:
+    facet_fields = {}
+    facet_limit = 10
+    facets_query_param = 'facets'
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        # Remember the filtered queryset, before ordering / pagination
+        self._facet_queryset = queryset
+        return queryset
+
+    def get_requested_facets(self):
+        value = self.request.query_params.get(self.facets_query_param)
+        if not value:
+            return []
+        names = [name.strip() for name in value.split(',') if name.strip()]
+        unknown = [name for name in names if name not in self.facet_fields]
+        if unknown:
+            raise ValidationError({
+                self.facets_query_param: f"Unknown facet(s): {', '.join(unknown)}. "
+                                         f"Choose from: {', '.join(self.facet_fields)}."
+            })
+        return names
+
+    def get_facets(self, queryset):
+        facets = {}
+        for name in self.get_requested_facets():
+            field, label = self.facet_fields[name]
+            columns = [field] if label is None else [field, label]
+            rows = (
+                queryset.order_by()
+                .values(*columns)
+                .annotate(facet_count=Count('pk'))
+                .order_by('-facet_count', field)[:self.facet_limit]
+            )
+            facets[name] = [
+                {'value': row[field], 'count': row['facet_count']}
+                if label is None else
+                {'value': row[field], 'label': row[label], 'count': row['facet_count']}
+                for row in rows
+            ]
+        return facets
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if self.get_requested_facets():
+            response.data['facets'] = self.get_facets(self._facet_queryset)
+        return response
@@ -0,0 +1,170 @@
+import copy
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import fields as drf_fields
+from rest_framework import relations
+from rest_framework.response import Response
+
+
+# ------------------------------------------------
+# Fast read-only representation
+# ------------------------------------------------
+# For large list pages most of the CPU goes into ModelSerializer's
+# field machinery: building a model instance per row, then calling
+# `get_attribute` + `to_representation` on every field.
+#
+# `FastRepresentation` looks at a ModelSerializer class once and
+# compiles a plain function turning a `.values()` row into the same
+# dict the serializer would produce (same keys, same order, same
+# values), so the rendered JSON is byte-identical.
+#
+# Only fields backed directly by a model column are supported:
+# - model fields (converted with the DRF field's own to_representation
+#   unless it is a no-op for the database type)
+# - primary-key relations (PrimaryKeyRelatedField and subclasses)
+# A serializer with anything else (nested serializers, method fields,
+# dotted sources...) is not compiled and keeps using the slow path.
+
+# DRF fields whose to_representation returns database values unchanged
+PASSTHROUGH_FIELDS = (drf_fields.IntegerField, drf_fields.CharField, drf_fields.BooleanField)
+
+
+class FastRepresentation:
+    _compiled = {}
+
+    def __init__(self, serializer_class, fields=None):
+        serializer = serializer_class() if fields is None else serializer_class(fields=fields)
+        model = serializer.Meta.model
+
+        self.columns = []
+        self.fields = []
+        self._converters = []
+        items = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            column = self._column_for(model, field)
+            self.columns.append(column)
+            self.fields.append(name)
+
+            value = f'row[{column!r}]'
+            if not self._is_passthrough(field):
+                converter = f'convert_{len(self._converters)}'
+                self._converters.append(self._converter_factory(field))
+                value = f'(None if {value} is None else {converter}({value}))'
+            items.append(f'{name!r}: {value}')
+
+        arguments = ', '.join(f'convert_{index}' for index in range(len(self._converters)))
+        source = (
+            f'def make({arguments}):\n'
+            '    def to_representation(row):\n'
+            '        return {' + ', '.join(items) + '}\n'
+            '    return to_representation\n'
+        )
+        namespace = {}
+        exec(compile(source, f'<fast {serializer_class.__name__}>', 'exec'), namespace)
+        self._make = namespace['make']
+
+    @classmethod
+    def for_serializer(cls, serializer_class, fields=None):
+        """Return the compiled representation, or None if unsupported.
+
+        `fields` restricts a DynamicFieldsModelSerializer to a sparse
+        fieldset; each fieldset is compiled once. The output follows
+        the serializer's field order, so the order of `fields` does not
+        matter.
+        """
+        key = (serializer_class, None if fields is None else frozenset(fields))
+        if key not in cls._compiled:
+            try:
+                cls._compiled[key] = cls(serializer_class, fields)
+            except NotImplementedError:
+                cls._compiled[key] = None
+        return cls._compiled[key]
+
+    @staticmethod
+    def _column_for(model, field):
+        if len(field.source_attrs) != 1:
+            raise NotImplementedError(field.source)
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            raise NotImplementedError(field.source)
+        if not model_field.concrete or model_field.many_to_many:
+            raise NotImplementedError(field.source)
+
+        if isinstance(field, relations.PrimaryKeyRelatedField):
+            if field.pk_field is not None or not model_field.is_relation:
+                raise NotImplementedError(field.source)
+            return model_field.attname
+        if isinstance(field, (relations.RelatedField, relations.ManyRelatedField)) or model_field.is_relation:
+            raise NotImplementedError(field.source)
+        # ModelField reads from the model instance itself
+        if isinstance(field, drf_fields.ModelField):
+            raise NotImplementedError(field.source)
+        return model_field.attname
+
+    @staticmethod
+    def _is_passthrough(field):
+        if isinstance(field, relations.PrimaryKeyRelatedField):
+            return True
+        return type(field) in PASSTHROUGH_FIELDS
+
+    @staticmethod
+    def _converter_factory(field):
+        # DateTimeField looks up the active timezone on every call, which
+        # costs more than the conversion itself. Resolve it once per
+        # serialize() call on a copy of the field instead; the output is
+        # the same since enforce_timezone() prefers an explicit timezone.
+        if isinstance(field, drf_fields.DateTimeField) and not hasattr(field, 'timezone'):
+            def factory():
+                resolved = copy.copy(field)
+                resolved.timezone = field.default_timezone()
+                return resolved.to_representation
+            return factory
+        return lambda: field.to_representation
+
+    def get_function(self):
+        """Return a `row -> dict` function valid for the current request."""
+        return self._make(*(factory() for factory in self._converters))
+
+    def serialize(self, rows):
+        to_representation = self.get_function()
+        return [to_representation(row) for row in rows]
+
+
+# ------------------------------------------------
+# FastListMixin
+# ------------------------------------------------
+# Add in front of a ListAPIView to serve GET lists through
+# FastRepresentation: rows are fetched with `.values()` for the
+# serializer's columns (plus the columns the paginator orders by)
+# and turned into dicts without creating model instances.
+#
+# Falls back to the regular serializer when the serializer can't be
+# compiled or `fast_list` is False.
+class FastListMixin:
+    fast_list = True
+
+    def list(self, request, *args, **kwargs):
+        fast = None
+        if self.fast_list:
+            fields = self.get_sparse_fields() if hasattr(self, 'get_sparse_fields') else None
+            fast = FastRepresentation.for_serializer(self.get_serializer_class(), fields)
+        paginator = self.paginator
+        if fast is None or (paginator is not None and not hasattr(paginator, 'get_row_columns')):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        columns = list(fast.columns)
+        if paginator is not None:
+            columns += [
+                column for column in paginator.get_row_columns(request, queryset, self)
+                if column not in columns
+            ]
+        rows = queryset.values(*columns)
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(fast.serialize(page))
+        return Response(fast.serialize(rows))
@@ -0,0 +1,216 @@
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+
+# ------------------------------------------------
+# Minimal HTTP load generator
+# ------------------------------------------------
+# Drives a running server with N concurrent keep-alive clients using
+# nothing but asyncio streams, so benchmarks need no extra packages.
+# Only what our own endpoints need is supported: plain http and
+# Content-Length bodies (no chunked responses).
+# - run_load(): one URL, e.g. sync vs async views
+# - run_mix(): a weighted, seeded mix of requests, e.g. read + write
+class LoadResult:
+    def __init__(self, latencies, errors, elapsed):
+        self.latencies = sorted(latencies)
+        self.errors = errors
+        self.elapsed = elapsed
+
+    @property
+    def requests(self):
+        return len(self.latencies)
+
+    @property
+    def rate(self):
+        return self.requests / self.elapsed if self.elapsed else 0
+
+    def percentile(self, percent):
+        if not self.latencies:
+            return 0
+        index = min(len(self.latencies) - 1, int(len(self.latencies) * percent / 100))
+        return self.latencies[index]
+
+    def as_dict(self):
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'seconds': round(self.elapsed, 3),
+            'requests_per_second': round(self.rate, 1),
+            'p50_ms': round(self.percentile(50) * 1000, 2),
+            'p95_ms': round(self.percentile(95) * 1000, 2),
+            'p99_ms': round(self.percentile(99) * 1000, 2),
+        }
+
+
+async def _request(reader, writer, method, host, path, body, headers):
+    lines = [f'{method} {path} HTTP/1.1', f'Host: {host}', 'Connection: keep-alive']
+    lines += [f'{name}: {value}' for name, value in headers.items()]
+    if body is not None:
+        lines.append(f'Content-Length: {len(body)}')
+    writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + (body or b''))
+    await writer.drain()
+
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('connection closed')
+    status = int(status_line.split()[1])
+    length, close = 0, False
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        name = name.strip().lower()
+        if name == 'content-length':
+            length = int(value)
+        elif name == 'connection' and value.strip().lower() == 'close':
+            close = True
+    await reader.readexactly(length)
+    return status, close
+
+
+async def _client(base_url, count, next_request, headers, latencies, errors):
+    # next_request() -> (label, method, path, body); results are
+    # collected per label
+    parts = urlsplit(base_url)
+    host, port = parts.hostname, parts.port or 80
+    reader = writer = None
+    for _ in range(count):
+        label, method, path, body = next_request()
+        latencies.setdefault(label, [])
+        errors.setdefault(label, 0)
+        started = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            status, close = await _request(reader, writer, method, parts.netloc, path, body, headers)
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError):
+            errors[label] += 1
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            continue
+        if status >= 400:
+            errors[label] += 1
+        else:
+            latencies[label].append(time.perf_counter() - started)
+        if close:
+            writer.close()
+            reader = writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def _run(base_url, clients, requests_per_client, make_client_requests, headers):
+    latencies, errors = {}, {}
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        _client(base_url, requests_per_client, make_client_requests(index), headers or {}, latencies, errors)
+        for index in range(clients)
+    ))
+    elapsed = time.perf_counter() - started
+    return {label: LoadResult(latencies[label], errors[label], elapsed) for label in latencies}
+
+
+async def run_load(url, clients, requests_per_client, method='GET', body=None, headers=None):
+    """Send `clients * requests_per_client` requests to `url` concurrently."""
+    parts = urlsplit(url)
+    path = parts.path + (f'?{parts.query}' if parts.query else '')
+    results = await _run(
+        url, clients, requests_per_client,
+        lambda index: lambda: ('', method, path, body), headers
+    )
+    return results['']
+
+
+async def run_mix(base_url, operations, clients, requests_per_client, seed=0, headers=None):
+    """Send a weighted mix of requests from `clients` concurrent clients.
+
+    `operations` is a list of (label, weight, build) where
+    build(rng) -> (method, path, body), or a function of the client
+    index returning such a list. Each client draws from its own
+    random.Random(seed + client index), so a run is reproducible.
+    A build that returns None has nothing left to request (e.g. no
+    more rows to delete) and is dropped from that client's mix.
+    Returns {label: LoadResult} plus the overall result under 'all'.
+    """
+    def make_client_requests(index):
+        rng = random.Random(seed + index)
+        mix = list(operations(index) if callable(operations) else operations)
+
+        def next_request():
+            while True:
+                operation = rng.choices(mix, [weight for _, weight, _ in mix])[0]
+                request = operation[2](rng)
+                if request is not None:
+                    return (operation[0],) + tuple(request)
+                mix.remove(operation)
+        return next_request
+
+    results = await _run(base_url, clients, requests_per_client, make_client_requests, headers)
+    elapsed = max((result.elapsed for result in results.values()), default=0)
+    results['all'] = LoadResult(
+        [latency for result in results.values() for latency in result.latencies],
+        sum(result.errors for result in results.values()),
+        elapsed,
+    )
+    return results
+
+
+# ------------------------------------------------
+# LocalServer
+# ------------------------------------------------
+# Runs `manage.py runserver` on a free port for the duration of a
+# `with` block and yields its base URL. `env` adds environment
+# variables for the server process.
+class LocalServer:
+    def __init__(self, manage_py, startup_timeout=30, env=None):
+        self.manage_py = str(manage_py)
+        self.startup_timeout = startup_timeout
+        self.env = env
+        self.process = None
+
+    def __enter__(self):
+        with socket.socket() as probe:
+            probe.bind(('127.0.0.1', 0))
+            port = probe.getsockname()[1]
+        self.process = subprocess.Popen(
+            [sys.executable, self.manage_py, 'runserver', f'127.0.0.1:{port}', '--noreload'],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            env={**os.environ, **self.env} if self.env else None,
+        )
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError('runserver exited during startup')
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                return f'http://127.0.0.1:{port}'
+            except OSError:
+                time.sleep(0.2)
+        self.__exit__(None, None, None)
+        raise RuntimeError('runserver did not start in time')
+
+    def __exit__(self, *exc_info):
+        if self.process is not None:
+            self.process.terminate()
+            self.process.wait(timeout=10)
+            self.process = None
+
+
+def git_commit(path):
+    """Short hash of the commit `path` is checked out at, or None."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=path,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
@@ -0,0 +1,65 @@
+import atexit
+import json
+import logging
+import queue
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+
+# ------------------------------------------------
+# JsonFormatter
+# ------------------------------------------------
+# One JSON object per line: time, level, logger, message, plus the
+# keys of the `event` dict passed as `extra={'event': {...}}`.
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        data = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        data.update(getattr(record, 'event', None) or {})
+        if record.exc_info:
+            data['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str)
+
+
+# ------------------------------------------------
+# QueueListenerHandler
+# ------------------------------------------------
+# A QueueHandler that owns its QueueListener, so the whole pipeline
+# can be declared in settings.LOGGING:
+#
+#   'queue': {
+#       '()': 'api.log.QueueListenerHandler',
+#       'handlers': ['cfg://handlers.json_console'],
+#   }
+#
+# The request thread only puts the record on an in-memory queue; the
+# listener thread does the formatting and the I/O of the target
+# handlers. The listener is stopped (and the queue drained) at exit.
+class QueueListenerHandler(QueueHandler):
+    def __init__(self, handlers, respect_handler_level=True):
+        super().__init__(queue.SimpleQueue())
+        targets = [handlers[index] for index in range(len(handlers))]  # resolves cfg:// references
+        if not all(isinstance(target, logging.Handler) for target in targets):
+            # Lets dictConfig retry once the target handlers exist
+            raise ValueError('target not configured yet')
+        self.listener = QueueListener(self.queue, *targets, respect_handler_level=respect_handler_level)
+        self.listener.start()
+        atexit.register(self.close)
+
+    def prepare(self, record):
+        # Formatting is left to the target handlers, on the listener
+        # thread; only make the record safe to hand over.
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def close(self):
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+        super().close()
@@ -0,0 +1,75 @@
+import asyncio
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from api.loadgen import run_load
+from api.models import Book
+
+# (label, sync route, async route)
+ENDPOINTS = [
+    ('list', 'book-list', 'async-book-list'),
+    ('detail', 'book-detail', 'async-book-detail'),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Load-tests the DRF book views against their native async variants '
+        'on a running server and reports requests/sec and p50/p95/p99 '
+        'latency. Start the server first with throttling off, e.g. '
+        '`API_THROTTLE_ENABLED=0 uvicorn advanced_api_project.asgi:application` '
+        'for ASGI or `API_THROTTLE_ENABLED=0 gunicorn advanced_api_project.wsgi` '
+        'for WSGI.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--base-url', default='http://127.0.0.1:8000',
+            help='Server to benchmark (default: http://127.0.0.1:8000).'
+        )
+        parser.add_argument(
+            '--clients', type=int, default=500,
+            help='Concurrent connections (default: 500).'
+        )
+        parser.add_argument(
+            '--requests', type=int, default=20,
+            help='Requests per client and endpoint (default: 20).'
+        )
+        parser.add_argument(
+            '--query', default='',
+            help='Query string added to list requests, e.g. "search=foundation".'
+        )
+        parser.add_argument(
+            '--json', action='store_true',
+            help='Print the results as JSON.'
+        )
+
+    def handle(self, *args, **options):
+        # The detail endpoints need an existing book in the server's database
+        book_id = Book.objects.values_list('id', flat=True).first()
+        if book_id is None:
+            raise CommandError('No books to benchmark; run import_books first.')
+
+        base_url = options['base_url'].rstrip('/')
+        results = []
+        for label, sync_name, async_name in ENDPOINTS:
+            for flavour, name in (('sync', sync_name), ('async', async_name)):
+                path = reverse(name, args=[book_id]) if label == 'detail' else reverse(name)
+                if label == 'list' and options['query']:
+                    path += '?' + options['query']
+                result = asyncio.run(run_load(base_url + path, options['clients'], options['requests']))
+                results.append(dict(endpoint=label, view=flavour, path=path, **result.as_dict()))
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(
+            f"{'endpoint':<8}  {'view':<5}  {'req/s':>8}  {'p50':>9}  {'p95':>9}  {'p99':>9}  {'errors':>6}"
+        )
+        for row in results:
+            self.stdout.write(
+                f"{row['endpoint']:<8}  {row['view']:<5}  {row['requests_per_second']:>8.1f}  "
+                f"{row['p50_ms']:>7.1f}ms  {row['p95_ms']:>7.1f}ms  {row['p99_ms']:>7.1f}ms  {row['errors']:>6}"
+            )
@@ -0,0 +1,127 @@
+import json
+import platform
+import time
+from datetime import datetime, timezone
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+from api.cache import KEY_PREFIX, get_cache
+from api.compression import ENCODERS
+from api.loadgen import git_commit
+from api.models import Book
+
+# Levels measured per encoding: fastest, the default, smallest
+LEVELS = {'zstd': [1, 3, 19], 'br': [1, 5, 11], 'gzip': [1, 6, 9]}
+
+
+class Command(BaseCommand):
+    help = (
+        'Measures what compressing real API responses costs and saves: '
+        'CPU time per response and compressed size for every available '
+        'encoding and a few levels, next to the cost of reading the '
+        'compressed bytes back from the cache (what a cached response '
+        'costs instead). Optionally writes JSON (--output).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Compressions per payload and level; the mean is reported (default: 20).'
+        )
+        parser.add_argument('--output', help='Write the results to this JSON file.')
+
+    def handle(self, *args, **options):
+        payloads = self._payloads()
+        repeat = max(1, options['repeat'])
+        report = {
+            'project': 'advanced-api-project',
+            'commit': git_commit(settings.BASE_DIR),
+            'time': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'encodings': list(ENCODERS),
+            'repeat': repeat,
+            'payloads': {},
+        }
+        for name, content in payloads.items():
+            rows = [self._measure(coding, level, content, repeat) for coding in ENCODERS for level in LEVELS[coding]]
+            rows.append(self._measure_cached(content, repeat))
+            report['payloads'][name] = {'bytes': len(content), 'results': rows}
+            self._print(name, len(content), rows)
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(report, output, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+    def _payloads(self):
+        # Real responses, rendered in-process without compression
+        max_ids = getattr(settings, 'API_BATCH_MAX_IDS', 500)
+        ids = list(Book.objects.order_by('id').values_list('id', flat=True)[:max_ids])
+        if not ids:
+            raise CommandError('No books to benchmark; load some with `benchmark_http --dataset 1k`.')
+        # Any host the settings accept; with DEBUG and no ALLOWED_HOSTS
+        # that is localhost.
+        hosts = [host for host in settings.ALLOWED_HOSTS if host != '*' and not host.startswith('.')]
+        client = Client(HTTP_HOST=hosts[0] if hosts else 'localhost')
+        paths = {
+            'list_20': '/api/books/?page_size=20',
+            'list_100': '/api/books/?page_size=100',
+            f'batch_{len(ids)}': '/api/books/?ids=' + ','.join(map(str, ids)),
+        }
+        payloads = {}
+        for name, path in paths.items():
+            response = client.get(path)
+            if response.status_code != 200:
+                raise CommandError(f'GET {path} returned {response.status_code}.')
+            payloads[name] = response.content
+        return payloads
+
+    def _measure(self, coding, level, content, repeat):
+        encode = ENCODERS[coding]
+        started = time.process_time()
+        for _ in range(repeat):
+            compressed = encode(content, level)
+        return self._row(coding, level, content, compressed, (time.process_time() - started) * 1000 / repeat)
+
+    def _measure_cached(self, content, repeat):
+        # What CompressionMiddleware does for a cached response: one
+        # cache read of the stored compressed body.
+        compressed = ENCODERS['gzip'](content, 6)
+        cache = get_cache()
+        key = f'{KEY_PREFIX}:benchmark:compression'
+        cache.set(key, compressed, 60)
+        started = time.process_time()
+        for _ in range(repeat):
+            cache.get(key)
+        cpu_ms = (time.process_time() - started) * 1000 / repeat
+        cache.delete(key)
+        return self._row('gzip (cached)', 6, content, compressed, cpu_ms)
+
+    @staticmethod
+    def _row(coding, level, content, compressed, cpu_ms):
+        saved = len(content) - len(compressed)
+        return {
+            'encoding': coding,
+            'level': level,
+            'cpu_ms': round(cpu_ms, 3),
+            'bytes': len(compressed),
+            'saved': saved,
+            'ratio': round(len(content) / len(compressed), 2),
+            'saved_per_cpu_ms': round(saved / cpu_ms) if cpu_ms else None,
+        }
+
+    def _print(self, name, size, rows):
+        self.stdout.write(self.style.MIGRATE_HEADING(f'{name} ({size:,} bytes)'))
+        self.stdout.write(
+            f"  {'encoding':<14}  {'level':>5}  {'cpu':>9}  {'bytes':>9}  {'ratio':>6}  {'saved/cpu ms':>12}"
+        )
+        for row in rows:
+            per_ms = '' if row['saved_per_cpu_ms'] is None else f"{row['saved_per_cpu_ms']:,}"
+            self.stdout.write(
+                f"  {row['encoding']:<14}  {row['level']:>5}  {row['cpu_ms']:>7.3f}ms  {row['bytes']:>9,}  "
+                f"{row['ratio']:>6.2f}  {per_ms:>12}"
+            )
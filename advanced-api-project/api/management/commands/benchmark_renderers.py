@@ -0,0 +1,68 @@
+import io
+
+from django.core.management.base import CommandError
+from django.db import transaction
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api.fast import FastRepresentation
+from api.management.commands.benchmark_serializers import Command as BenchmarkSerializersCommand
+from api.management.commands.benchmark_serializers import Rollback
+from api.messagepack import MessagePackParser, MessagePackRenderer, msgpack
+from api.models import Book
+from api.serializers import BookSerializer
+
+
+# Same --rows / --repeat options, synthetic data and timing as
+# benchmark_serializers.
+class Command(BenchmarkSerializersCommand):
+    help = (
+        'Compares MessagePack with JSONRenderer / JSONParser on BookSerializer '
+        'output: time to render a list response, time to parse a bulk '
+        'create body, and their sizes. Rows are created inside a '
+        'transaction that is rolled back afterwards.'
+    )
+
+    def handle(self, *args, **options):
+        if msgpack is None:
+            raise CommandError('The msgpack package is not installed.')
+        fast = FastRepresentation.for_serializer(BookSerializer)
+        formats = [
+            ('json', JSONRenderer(), JSONParser()),
+            ('msgpack', MessagePackRenderer(), MessagePackParser()),
+        ]
+        repeat = options['repeat']
+
+        self.stdout.write(
+            f"{'rows':>8}  {'format':<8}  {'render':>10}  {'parse':>10}  {'list bytes':>12}  {'body bytes':>12}"
+        )
+        for rows in options['rows']:
+            try:
+                with transaction.atomic():
+                    self._seed(rows)
+                    data = fast.serialize(Book.objects.order_by('id').values(*fast.columns))
+                    raise Rollback
+            except Rollback:
+                pass
+            # What a bulk create sends: the writable fields only
+            items = [
+                {'title': item['title'], 'publication_year': item['publication_year'], 'author': item['author']}
+                for item in data
+            ]
+
+            results = []
+            for name, renderer, parser in formats:
+                render_time, body = self._best(repeat, lambda: renderer.render(data))
+                request_body = renderer.render(items)
+                parse_time, parsed = self._best(
+                    repeat, lambda: parser.parse(io.BytesIO(request_body))
+                )
+                if parsed != items:
+                    raise AssertionError(f'{name} did not round-trip the request body')
+                results.append((name, render_time, parse_time, len(body), len(request_body)))
+
+            for name, render_time, parse_time, size, request_size in results:
+                self.stdout.write(
+                    f'{rows:>8}  {name:<8}  {render_time * 1000:>8.1f}ms  {parse_time * 1000:>8.1f}ms  '
+                    f'{size:>12,}  {request_size:>12,}'
+                )
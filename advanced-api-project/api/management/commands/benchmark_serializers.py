@@ -0,0 +1,87 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from api.fast import FastRepresentation
+from api.models import Author, Book
+from api.serializers import BookSerializer
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Compares BookSerializer with the fast read path (api/fast.py) on '
+        'synthetic data. Rows are created inside a transaction that is '
+        'rolled back afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows', type=int, nargs='+', default=[1000, 10000, 100000],
+            help='Dataset sizes to benchmark (default: 1000 10000 100000).'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=3,
+            help='Runs per path; the best one is reported (default: 3).'
+        )
+
+    def handle(self, *args, **options):
+        fast = FastRepresentation.for_serializer(BookSerializer)
+        renderer = JSONRenderer()
+
+        self.stdout.write(f"{'rows':>8}  {'serializer':>12}  {'fast path':>12}  {'speedup':>8}")
+        for rows in options['rows']:
+            try:
+                with transaction.atomic():
+                    self._seed(rows)
+                    queryset = Book.objects.order_by('id')
+
+                    slow_time, slow_body = self._best(
+                        options['repeat'],
+                        lambda: renderer.render(BookSerializer(queryset, many=True).data)
+                    )
+                    fast_time, fast_body = self._best(
+                        options['repeat'],
+                        lambda: renderer.render(fast.serialize(queryset.values(*fast.columns)))
+                    )
+                    if slow_body != fast_body:
+                        raise AssertionError('Fast path output differs from BookSerializer')
+                    raise Rollback
+            except Rollback:
+                pass
+
+            self.stdout.write(
+                f'{rows:>8}  {slow_time * 1000:>10.1f}ms  {fast_time * 1000:>10.1f}ms  '
+                f'{slow_time / fast_time:>7.1f}x'
+            )
+
+    def _seed(self, rows):
+        authors = Author.objects.bulk_create(
+            Author(name=f'Author {index}') for index in range(max(1, rows // 10))
+        )
+        Book.objects.bulk_create(
+            (
+                Book(
+                    title=f'Book {index}',
+                    publication_year=1900 + index % 120,
+                    author=authors[index % len(authors)],
+                )
+                for index in range(rows)
+            ),
+            batch_size=1000
+        )
+
+    @staticmethod
+    def _best(repeat, func):
+        best, result = None, None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
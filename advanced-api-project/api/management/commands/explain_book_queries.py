@@ -0,0 +1,131 @@
+from itertools import combinations, permutations, product
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.models import Author
+from api.search import FTS_TABLE
+from api.views import BookListView
+
+# Placeholder values per filter; the plan does not depend on them
+SAMPLE_VALUES = {
+    'title': 'Foundation',
+    'publication_year': '1951',
+    'search': 'foundation',
+}
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Runs EXPLAIN QUERY PLAN for every filter + search + ordering '
+        'combination BookListView accepts (including multi-column '
+        '?ordering= values) and flags full table scans and temporary '
+        'B-tree sorts. Exits with an error when --strict finds a problem.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--strict', action='store_true',
+            help='Fail when any combination needs a full scan or a sort.'
+        )
+        parser.add_argument(
+            '--verbose-plans', action='store_true',
+            help='Print the full plan of every query.'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('EXPLAIN QUERY PLAN is only available on SQLite.')
+
+        view_class = BookListView
+        filters = list(view_class.filterset_fields) + ['search']
+        orderings = [None] + self._ordering_values(view_class.ordering_fields)
+
+        try:
+            with transaction.atomic():
+                # The author filter only accepts existing authors
+                author = Author.objects.first() or Author.objects.create(name='Sample')
+                problems = self._explain_all(view_class, filters, orderings, author, options)
+                raise Rollback
+        except Rollback:
+            pass
+
+        if problems and options['strict']:
+            raise CommandError(f'{problems} query combination(s) need a full scan or a sort.')
+        self.stdout.write(f'{problems} combination(s) flagged.')
+
+    def _explain_all(self, view_class, filters, orderings, author, options):
+        samples = dict(SAMPLE_VALUES, author=str(author.pk))
+        problems = 0
+        for size in range(len(filters) + 1):
+            for filter_names in combinations(filters, size):
+                for ordering in orderings:
+                    params = {name: samples.get(name, '1') for name in filter_names}
+                    if ordering:
+                        params['ordering'] = ordering
+                    sql, plan = self._explain(view_class, params)
+                    issues = self._issues(plan, searching='search' in params)
+                    problems += bool(issues)
+
+                    label = '&'.join(f'{key}={value}' for key, value in params.items()) or '(no params)'
+                    if issues:
+                        self.stdout.write(self.style.WARNING(f'{label}: ' + '; '.join(issues)))
+                    else:
+                        self.stdout.write(f'{label}: ok')
+                    if options['verbose_plans']:
+                        self.stdout.write(f'    {sql}')
+                        for detail in plan:
+                            self.stdout.write(f'    {detail}')
+        return problems
+
+    def _explain(self, view_class, params):
+        # Build the page query exactly as the view would for these params
+        view = view_class()
+        view.request = Request(APIRequestFactory().get('/api/books/', params))
+        view.args, view.kwargs, view.format_kwarg = (), {}, None
+
+        queryset = view.filter_queryset(view.get_queryset())
+        paginator = view.paginator
+        ordering = paginator.get_ordering(view.request, queryset, view)
+        queryset = queryset.order_by(*ordering)[:paginator.page_size + 1]
+
+        sql, sql_params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, sql_params)
+            plan = [row[-1] for row in cursor.fetchall()]
+        return sql, plan
+
+    @staticmethod
+    def _ordering_values(fields):
+        # Every ?ordering= value the OrderingFilter parses: each
+        # sequence of distinct fields, in both directions
+        values = []
+        for size in range(1, len(fields) + 1):
+            for names in permutations(fields, size):
+                for signs in product(('', '-'), repeat=size):
+                    values.append(','.join(sign + name for sign, name in zip(signs, names)))
+        return values
+
+    @staticmethod
+    def _issues(plan, searching=False):
+        issues = []
+        if searching:
+            # The full-text match must be the outer loop (api_book read
+            # by pk); sorting its matches is expected.
+            tables = [detail for detail in plan if 'api_book' in detail]
+            if tables and not tables[0].startswith(f'SCAN {FTS_TABLE} '):
+                issues.append(f'full-text match is not the outer loop ({tables[0]})')
+            plan = [detail for detail in plan if FTS_TABLE not in detail and 'TEMP B-TREE' not in detail]
+        for detail in plan:
+            # "SCAN api_book USING INDEX ..." walks an index in order: fine
+            if detail.startswith('SCAN ') and ' USING ' not in detail:
+                issues.append(f'full scan ({detail})')
+            if 'USE TEMP B-TREE' in detail:
+                issues.append(f'sort ({detail})')
+        return issues
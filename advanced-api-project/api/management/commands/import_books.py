@@ -0,0 +1,139 @@
+import csv
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api import search
+from api.cache import bump_version
+from api.models import Author, Book
+
+
+class Command(BaseCommand):
+    help = (
+        'Imports books from a JSON Lines or CSV file. Each record needs '
+        '`title`, `publication_year` and the author name (`author_name`, '
+        'or `author`), which is the format /api/books/export/ produces. '
+        'The file is streamed, so its size does not matter, and the import '
+        'can be resumed from the byte offset printed after every chunk.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import (.ndjson/.jsonl or .csv).')
+        parser.add_argument(
+            '--format', choices=['ndjson', 'csv'],
+            help='File format (default: guessed from the extension).'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=5000,
+            help='Books inserted per transaction (default: 5000).'
+        )
+        parser.add_argument(
+            '--offset', type=int, default=0,
+            help='Byte offset to resume from, as printed by a previous run.'
+        )
+        parser.add_argument(
+            '--skip-index', action='store_true',
+            help='Do not update the search index; run rebuild_search_index afterwards.'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or ('csv' if path.endswith('.csv') else 'ndjson')
+        chunk_size = options['chunk_size']
+        self.skip_index = options['skip_index']
+
+        # Every author is resolved through this map; new ones are added per chunk
+        self.author_ids = dict(Author.objects.values_list('name', 'id'))
+
+        started = time.monotonic()
+        imported = skipped = 0
+        chunk = []
+        try:
+            with open(path, 'rb') as source:
+                header = self._read_header(source) if file_format == 'csv' else None
+                if options['offset']:
+                    source.seek(options['offset'])
+
+                offset = source.tell()
+                for line in iter(source.readline, b''):
+                    line_offset = offset
+                    offset += len(line)
+                    if not line.strip():
+                        continue
+
+                    try:
+                        chunk.append(self._parse(line, header))
+                    except (ValueError, TypeError, csv.Error) as exc:
+                        skipped += 1
+                        self.stderr.write(f'Skipping record at byte {line_offset}: {exc}')
+
+                    if len(chunk) >= chunk_size:
+                        imported += self._save(chunk)
+                        chunk = []
+                        self._progress(imported, started, offset)
+
+                if chunk:
+                    imported += self._save(chunk)
+                    self._progress(imported, started, offset)
+        except OSError as exc:
+            raise CommandError(f'Cannot read {path}: {exc}')
+        finally:
+            if imported:
+                bump_version(Book)
+
+        elapsed = time.monotonic() - started
+        rate = imported / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {imported} books ({skipped} skipped) in {elapsed:.1f}s, {rate:,.0f} rows/sec.'
+        ))
+
+    def _read_header(self, source):
+        source.seek(0)
+        header = next(csv.reader([source.readline().decode('utf-8-sig')]), None)
+        if not header:
+            raise CommandError('The CSV file has no header row.')
+        return header
+
+    def _parse(self, line, header):
+        # Returns (title, publication_year, author_name) or raises ValueError
+        text = line.decode('utf-8')
+        if header is None:
+            record = json.loads(text)
+            if not isinstance(record, dict):
+                raise ValueError('not a JSON object')
+        else:
+            # One record per line: quoted fields must not contain newlines
+            record = dict(zip(header, next(csv.reader([text]))))
+
+        title = record.get('title')
+        author_name = record.get('author_name') or record.get('author')
+        if not isinstance(title, str) or not title.strip() or len(title.strip()) > 100:
+            raise ValueError('title must be 1 to 100 characters')
+        if not isinstance(author_name, str) or not author_name.strip() or len(author_name.strip()) > 100:
+            raise ValueError('author name must be 1 to 100 characters')
+        return title.strip(), int(record.get('publication_year')), author_name.strip()
+
+    def _save(self, chunk):
+        with transaction.atomic():
+            missing = {name for _, _, name in chunk if name not in self.author_ids}
+            if missing:
+                for author in Author.objects.bulk_create(Author(name=name) for name in missing):
+                    self.author_ids[author.name] = author.id
+
+            books = Book.objects.bulk_create(
+                Book(title=title, publication_year=year, author_id=self.author_ids[name])
+                for title, year, name in chunk
+            )
+            if not self.skip_index:
+                search.index_books(
+                    [(book.pk, book.title, name) for book, (_, _, name) in zip(books, chunk)],
+                    replace=False
+                )
+        return len(books)
+
+    def _progress(self, imported, started, offset):
+        elapsed = time.monotonic() - started
+        rate = imported / elapsed if elapsed else 0
+        self.stdout.write(f'{imported} books, {rate:,.0f} rows/sec; resume with --offset {offset}')
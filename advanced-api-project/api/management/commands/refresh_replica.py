@@ -0,0 +1,61 @@
+import os
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (
+        'Copies the primary SQLite database to the stand-in replica '
+        '(every alias in DATABASE_REPLICAS, or --to), once or every '
+        '--interval seconds. Each copy is a consistent snapshot (SQLite '
+        'backup API) swapped in atomically, so readers see either the '
+        'old or the new copy, lagging behind by up to the interval like '
+        'a real replica.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--to', help='Copy to this file instead of the configured replicas.')
+        parser.add_argument(
+            '--interval', type=float,
+            help='Keep refreshing every this many seconds (default: copy once).'
+        )
+
+    def handle(self, *args, **options):
+        primary = connections[DEFAULT_DB_ALIAS]
+        if primary.vendor != 'sqlite':
+            raise CommandError('Stand-in replicas are copies of an SQLite primary.')
+        if options['to']:
+            targets = [options['to']]
+        else:
+            targets = [
+                settings.DATABASES[alias]['NAME'] for alias in getattr(settings, 'DATABASE_REPLICAS', [])
+            ]
+        if not targets:
+            raise CommandError('No replicas configured (set DJANGO_DB_REPLICA=1) and no --to given.')
+
+        while True:
+            started = time.monotonic()
+            for target in targets:
+                self.copy(primary, str(target))
+            elapsed = time.monotonic() - started
+            self.stdout.write(f"Refreshed {', '.join(map(str, targets))} in {elapsed * 1000:.0f}ms")
+            if not options['interval']:
+                return
+            time.sleep(max(0.0, options['interval'] - elapsed))
+
+    def copy(self, primary, target):
+        temporary = f'{target}.tmp'
+        primary.ensure_connection()
+        destination = sqlite3.connect(temporary)
+        try:
+            primary.connection.backup(destination)
+        except BaseException:
+            destination.close()
+            os.remove(temporary)
+            raise
+        destination.close()
+        os.replace(temporary, target)
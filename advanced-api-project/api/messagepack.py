@@ -0,0 +1,47 @@
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# Optional: only registered in REST_FRAMEWORK when installed
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+# ------------------------------------------------
+# MessagePack renderer / parser
+# ------------------------------------------------
+# A binary alternative to JSON for service-to-service traffic:
+#   Accept: application/msgpack         -> MessagePack response
+#   Content-Type: application/msgpack   -> MessagePack request body
+# or ?format=msgpack in the URL.
+#
+# The data is the same as with JSON: values JSON can't hold (dates,
+# decimals, UUIDs, lazy strings...) are converted by DRF's own
+# JSONEncoder, so both formats carry identical structures.
+_encoder = JSONEncoder()
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=_encoder.default, use_bin_type=True)
+
+
+class MessagePackParser(BaseParser):
+    media_type = 'application/msgpack'
+    renderer_class = MessagePackRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except (ValueError, TypeError, msgpack.UnpackException) as exc:
+            raise ParseError(f'MessagePack parse error - {exc}')
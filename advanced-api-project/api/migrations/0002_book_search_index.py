@@ -0,0 +1,33 @@
+from django.db import migrations
+
+from api import search
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    search.create_index(schema_editor.connection)
+
+    # Index the books that already exist
+    Book = apps.get_model('api', 'Book')
+    rows = Book.objects.using(schema_editor.connection.alias).values_list(
+        'id', 'title', 'author__name'
+    )
+    search.index_books(rows.iterator(), using=schema_editor.connection.alias, replace=False)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    search.drop_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,34 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+from api import search
+
+
+def rebuild_search_index(apps, schema_editor):
+    # Recreate the index with the UNINDEXED book_id join column
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    search.drop_index(schema_editor.connection)
+    search.create_index(schema_editor.connection)
+
+    Book = apps.get_model('api', 'Book')
+    rows = Book.objects.using(schema_editor.connection.alias).values_list(
+        'id', 'title', 'author__name'
+    )
+    search.index_books(rows.iterator(), using=schema_editor.connection.alias, replace=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_book_search_index_model'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='booksearchindex',
+            name='book',
+            field=models.OneToOneField(db_column='book_id', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='api.book'),
+        ),
+        migrations.RunPython(rebuild_search_index, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,9 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import autocomplete, search
+from .cache import bump_version
 
 # Create your models here.
 # -----------------------------
@@ -8,6 +13,8 @@ from django.db import models
 # One author can have multiple related books.
 class Author(models.Model):
     name = models.CharField(max_length=100)
+    # Drives Last-Modified / ETag headers
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
@@ -28,8 +35,89 @@ class Book(models.Model):
         on_delete=models.PROTECT,
         related_name='books'
     )
+    # Drives Last-Modified / ETag headers
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # One index per filter + ordering combination BookListView
+    # supports, each ending in `id` (the pagination tie-breaker), so
+    # ordered pages are read in index order instead of sorting the
+    # table. `manage.py explain_book_queries` checks them.
+    class Meta:
+        indexes = [
+            models.Index(fields=['title', 'id'], name='book_title_id_idx'),
+            models.Index(fields=['publication_year', 'id'], name='book_year_id_idx'),
+            models.Index(fields=['title', 'publication_year', 'id'], name='book_title_year_idx'),
+            models.Index(fields=['publication_year', 'title', 'id'], name='book_year_title_idx'),
+            models.Index(fields=['author', 'title', 'id'], name='book_author_title_idx'),
+            models.Index(fields=['author', 'publication_year', 'id'], name='book_author_year_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
 
+# -----------------------------
+# BookSearchIndex Model
+# -----------------------------
+# Read-only mapping of the FTS5 book index (see search.py), one row
+# per book with book_id = rowid = Book.id. Unmanaged: migrations 0002
+# and 0006 create the virtual table and the signal receivers below
+# fill it. Only queried
+# through the `search_index` relation, together with a MATCH on
+# `document` (the rank is only defined for full-text queries).
+class BookSearchIndex(models.Model):
+    book = models.OneToOneField(
+        Book,
+        primary_key=True,
+        db_column='book_id',
+        db_constraint=False,
+        on_delete=models.DO_NOTHING,
+        related_name='search_index'
+    )
+    document = search.DocumentField(db_column=search.FTS_TABLE)
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = search.FTS_TABLE
+
+
+# -----------------------------
+# Search index and cache hooks
+# -----------------------------
+# Keep the FTS5 book index (see search.py) in sync with the tables.
+# Authors cannot be deleted while they still have books (PROTECT),
+# so only renames need to be propagated from Author.
+#
+# Every Book save / delete and Author rename (API, admin, shell) also
+# bumps the Book version that list ETags and the response cache are
+# keyed on (see cache.py), once the change is committed: bumping
+# earlier would let a concurrent read cache the old rows under the
+# new version. Bulk paths that send no signals (bulk_create,
+# QuerySet.update) bump it themselves.
+@receiver(post_save, sender=Book)
+def index_book(sender, instance, raw=False, using=None, **kwargs):
+    if raw:
+        return
+    search.index_books([(instance.pk, instance.title, instance.author.name)], using=using)
+    # The in-memory index must not see changes that get rolled back
+    rows = [(instance.pk, instance.title)]
+    transaction.on_commit(lambda: autocomplete.index.put(rows), using=using)
+    transaction.on_commit(lambda: bump_version(Book), using=using)
+
+
+@receiver(post_delete, sender=Book)
+def unindex_book(sender, instance, using=None, **kwargs):
+    search.unindex_books([instance.pk], using=using)
+    ids = [instance.pk]
+    transaction.on_commit(lambda: autocomplete.index.remove(ids), using=using)
+    transaction.on_commit(lambda: bump_version(Book), using=using)
+
+
+@receiver(post_save, sender=Author)
+def reindex_author_books(sender, instance, created, raw=False, using=None, **kwargs):
+    if created or raw:
+        return
+    search.rename_author(instance.pk, instance.name, using=using)
+    # Book responses carry the author name (search, facets)
+    transaction.on_commit(lambda: bump_version(Book), using=using)
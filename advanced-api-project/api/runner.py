@@ -0,0 +1,26 @@
+import logging
+
+from django.test.runner import DiscoverRunner
+
+
+# ------------------------------------------------
+# Test runner
+# ------------------------------------------------
+# DiscoverRunner that swaps the `api` logger's handlers for a
+# NullHandler while the suite runs, so the queue listener does not
+# print JSON events between the test dots. Tests check events with
+# assertLogs, which attaches its own handler.
+#
+# Enabled with TEST_RUNNER in settings.py.
+class QuietLogTestRunner(DiscoverRunner):
+    logger_name = 'api'
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        logger = logging.getLogger(self.logger_name)
+        self._handlers = logger.handlers
+        logger.handlers = [logging.NullHandler()]
+
+    def teardown_test_environment(self, **kwargs):
+        logging.getLogger(self.logger_name).handlers = self._handlers
+        super().teardown_test_environment(**kwargs)
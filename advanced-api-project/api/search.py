@@ -0,0 +1,161 @@
+from django.db import DEFAULT_DB_ALIAS, connections, models
+from django.db.models import F, Lookup
+from rest_framework import filters
+
+
+# ------------------------------------------------
+# Full-text index (SQLite FTS5)
+# ------------------------------------------------
+# `api_book_fts` is an FTS5 virtual table holding one row per book:
+#   rowid        -> Book.id
+#   title        -> Book.title
+#   author_name  -> Book.author.name
+#   book_id      -> Book.id again, UNINDEXED: the join column (see
+#                   FTS5SearchFilter)
+#
+# It is created by migration 0002 (rebuilt by 0006) and kept in sync by the Book/Author
+# signal receivers in models.py. `manage.py rebuild_search_index`
+# recreates its content from scratch.
+#
+# Every helper is a no-op on databases other than SQLite, where
+# FTS5SearchFilter falls back to the regular icontains search.
+FTS_TABLE = 'api_book_fts'
+
+
+def fts_enabled(using=None):
+    return connections[using or DEFAULT_DB_ALIAS].vendor == 'sqlite'
+
+
+def create_index(conn):
+    conn.cursor().execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        "title, author_name, book_id UNINDEXED, tokenize = 'unicode61 remove_diacritics 2')"
+    )
+
+
+def drop_index(conn):
+    conn.cursor().execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+def index_books(rows, using=None, replace=True):
+    """Insert or replace (id, title, author_name) rows in the index."""
+    rows = list(rows)
+    if not rows or not fts_enabled(using):
+        return
+    with connections[using or DEFAULT_DB_ALIAS].cursor() as cursor:
+        if replace:
+            cursor.executemany(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+                [(row[0],) for row in rows]
+            )
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE} (rowid, title, author_name, book_id) VALUES (%s, %s, %s, %s)',
+            [(pk, title, author_name, pk) for pk, title, author_name in rows]
+        )
+
+
+def unindex_books(ids, using=None):
+    ids = list(ids)
+    if not ids or not fts_enabled(using):
+        return
+    with connections[using or DEFAULT_DB_ALIAS].cursor() as cursor:
+        cursor.executemany(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+            [(pk,) for pk in ids]
+        )
+
+
+def rename_author(author_id, name, using=None):
+    """Propagate an author's new name to all of their indexed books."""
+    if not fts_enabled(using):
+        return
+    with connections[using or DEFAULT_DB_ALIAS].cursor() as cursor:
+        cursor.execute(
+            f'UPDATE {FTS_TABLE} SET author_name = %s '
+            'WHERE rowid IN (SELECT id FROM api_book WHERE author_id = %s)',
+            [name, author_id]
+        )
+
+
+class Match(Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', (*lhs_params, *rhs_params)
+
+
+class DocumentField(models.TextField):
+    # FTS5's hidden column named after the table: the left-hand side
+    # of a full-text query (`api_book_fts MATCH 'robot'`)
+    pass
+
+
+DocumentField.register_lookup(Match)
+
+
+def build_match_query(terms):
+    # Each term becomes a quoted prefix query, so `?search=asim rob`
+    # matches "Isaac Asimov" / "I, Robot". Terms are ANDed together.
+    # Quoting also neutralises FTS5 operators in user input.
+    return ' '.join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+
+
+# ------------------------------------------------
+# FTS5SearchFilter
+# ------------------------------------------------
+# Drop-in replacement for filters.SearchFilter.
+#
+# Instead of OR-ing `icontains` lookups across a JOIN to Author, the
+# search terms are matched against the FTS5 index and the results are
+# annotated with their bm25 relevance as `search_rank` (lower is
+# better). Use it together with RelevanceOrderingFilter to return the
+# best matches first.
+#
+# The index is joined on its `book_id` column (the BookSearchIndex
+# model), so SQLite runs the MATCH once and reads each hit's rank from
+# the join. The column is UNINDEXED on purpose: joined on rowid, SQLite
+# would happily walk an api_book index (?author=, ?ordering=title) and
+# probe the full-text query once per book, as would a correlated
+# `SELECT rank ... WHERE rowid = api_book.id`. Without a rowid to probe
+# by, the MATCH always drives the query and api_book is read by pk.
+class FTS5SearchFilter(filters.SearchFilter):
+    rank_field = 'search_rank'
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        if not fts_enabled(queryset.db):
+            return super().filter_queryset(request, queryset, view)
+
+        return queryset.filter(
+            search_index__document__match=build_match_query(terms)
+        ).annotate(**{self.rank_field: F('search_index__rank')})
+
+
+# ------------------------------------------------
+# RelevanceOrderingFilter
+# ------------------------------------------------
+# OrderingFilter that orders search results by relevance unless the
+# client explicitly asks for another ordering with ?ordering=.
+#
+# Only the first `max_ordering_columns` valid columns of ?ordering= are
+# used (extra ones are ignored, like unknown fields): each single
+# column + id has an index, while multi-column and mixed-direction
+# orderings would need a sort of the whole result.
+# `manage.py explain_book_queries` checks every accepted value.
+class RelevanceOrderingFilter(filters.OrderingFilter):
+    rank_field = FTS5SearchFilter.rank_field
+    max_ordering_columns = 1
+
+    def remove_invalid_fields(self, queryset, fields, view, request):
+        valid = super().remove_invalid_fields(queryset, fields, view, request)
+        return valid[:self.max_ordering_columns]
+
+    def get_ordering(self, request, queryset, view):
+        explicit = request.query_params.get(self.ordering_param)
+        if not explicit and self.rank_field in queryset.query.annotations:
+            return [self.rank_field]
+        return super().get_ordering(request, queryset, view)
@@ -1,19 +1,100 @@
 import datetime
 
+from django.db import transaction
 from rest_framework import serializers
+from . import autocomplete, search
 from .models import Book, Author
 
 
+# ------------------------------------------------
+# AuthorField
+# ------------------------------------------------
+# Primary key field for Book.author. Bulk requests put the authors
+# they reference in the serializer context (`authors`: {pk: Author}),
+# so validating N books does not cost N author lookups. Unknown ids
+# fall back to the regular lookup, and its error message.
+class AuthorField(serializers.PrimaryKeyRelatedField):
+    def to_internal_value(self, data):
+        authors = self.context.get('authors')
+        if authors is not None:
+            try:
+                return authors[int(data)]
+            except (KeyError, TypeError, ValueError):
+                pass
+        return super().to_internal_value(data)
+
+
+# ------------------------------------------------
+# DynamicFieldsModelSerializer
+# ------------------------------------------------
+# ModelSerializer taking an extra `fields` argument that keeps only
+# the named fields, for sparse fieldsets (?fields= / ?exclude=).
+class DynamicFieldsModelSerializer(serializers.ModelSerializer):
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+# ------------------------------------------------
+# BookListSerializer
+# ------------------------------------------------
+# Used by BookSerializer(many=True).
+# - Validates every item and reports errors per item index.
+# - With `skip_invalid` in the context, invalid items are left out
+#   (their errors end up in `item_errors`) instead of failing the batch.
+# - Inserts all books with bulk_create, `batch_size` rows per query,
+#   in a single transaction.
+class BookListSerializer(serializers.ListSerializer):
+    item_errors = None
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list) or not data:
+            return super().to_internal_value(data)
+
+        valid, errors = [], {}
+        for index, item in enumerate(data):
+            try:
+                valid.append(self.run_child_validation(item))
+            except serializers.ValidationError as exc:
+                errors[index] = exc.detail
+
+        if errors and (not self.context.get('skip_invalid') or not valid):
+            raise serializers.ValidationError([errors.get(index, {}) for index in range(len(data))])
+
+        self.item_errors = errors
+        return valid
+
+    def create(self, validated_data):
+        books = [Book(**item) for item in validated_data]
+        with transaction.atomic():
+            Book.objects.bulk_create(books, batch_size=self.context.get('batch_size'))
+            # bulk_create sends no post_save signals: index explicitly
+            search.index_books(
+                [(book.pk, book.title, book.author.name) for book in books],
+                replace=False
+            )
+            rows = [(book.pk, book.title) for book in books]
+            transaction.on_commit(lambda: autocomplete.index.put(rows))
+        return books
+
+
 # ------------------------------------------------
 # BookSerializer
 # ------------------------------------------------
 # Serializes all fields of the Book model.
 # Includes custom validation to ensure the
 # publication year is not in the future.
-class BookSerializer(serializers.ModelSerializer):
+class BookSerializer(DynamicFieldsModelSerializer):
+    serializer_related_field = AuthorField
+
     class Meta:
         model = Book
         fields = '__all__' # serialize all book fields
+        list_serializer_class = BookListSerializer
 
         # Custom validation: publication_year must not be in the future
         def validate_publication_year(self, value):
@@ -34,14 +115,19 @@ class BookSerializer(serializers.ModelSerializer):
 #
 # The nested representation allows all books for an author
 # to be included automatically.
+#
+# `book_count` must be annotated on the queryset (see
+# AuthorListView), since `books` may be capped to the top N.
 class AuthorSerializer(serializers.ModelSerializer):
     # Nested serializer — read-only list of related books
     books = BookSerializer(many=True, read_only=True)
+    book_count = serializers.IntegerField(read_only=True)
     class Meta:
         model = Author
         fields = (
             'id',
             'name',
+            'book_count',
             'books'
         )
 
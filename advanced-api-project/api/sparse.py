@@ -0,0 +1,74 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.exceptions import ValidationError
+
+
+# ------------------------------------------------
+# SparseFieldsMixin
+# ------------------------------------------------
+# Lets clients ask for only the fields they need:
+#   ?fields=id,title         -> only these fields
+#   ?exclude=updated_at      -> every field but these
+#
+# The serializer (a DynamicFieldsModelSerializer) drops the other
+# fields, and the queryset is narrowed with .only() so the database
+# does not read the unused columns either. The fast list path
+# (FastListMixin) picks the fieldset up as well and selects just
+# those columns.
+class SparseFieldsMixin:
+
+    def get_sparse_fields(self):
+        """Return the requested field names as a tuple, or None for all."""
+        if hasattr(self, '_sparse_fields'):
+            return self._sparse_fields
+
+        params = self.request.query_params
+        fields, exclude = params.get('fields'), params.get('exclude')
+        if not fields and not exclude:
+            self._sparse_fields = None
+            return None
+
+        available = list(self.get_serializer_class()().fields)
+        selected = self._parse_names('fields', fields, available) if fields else available
+        excluded = self._parse_names('exclude', exclude, available) if exclude else []
+        # Normalized (no duplicates, serializer order): a fast
+        # representation is compiled per fieldset, so their number is
+        # bounded by the valid fieldsets, not by the query strings
+        wanted = set(selected) - set(excluded)
+        self._sparse_fields = tuple(name for name in available if name in wanted)
+        if not self._sparse_fields:
+            raise ValidationError({'fields': 'No fields selected.'})
+        return self._sparse_fields
+
+    @staticmethod
+    def _parse_names(param, value, available):
+        names = [name.strip() for name in value.split(',') if name.strip()]
+        unknown = [name for name in names if name not in available]
+        if unknown:
+            raise ValidationError({param: f"Unknown field(s): {', '.join(unknown)}. Choose from: {', '.join(available)}."})
+        return names
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            kwargs['fields'] = fields
+        return super().get_serializer(*args, **kwargs)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = self.get_sparse_fields()
+        if fields is None:
+            return queryset
+
+        serializer = self.get_serializer_class()(fields=fields)
+        model = queryset.model
+        columns = {model._meta.pk.name}
+        for field in serializer.fields.values():
+            if not field.source_attrs:
+                continue
+            try:
+                model_field = model._meta.get_field(field.source_attrs[0])
+            except FieldDoesNotExist:
+                continue
+            if model_field.concrete:
+                columns.add(model_field.name)
+        return queryset.only(*columns)
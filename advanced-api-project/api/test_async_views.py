@@ -0,0 +1,75 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from api.models import Author, Book
+
+
+class AsyncBookViewsTestCase(TestCase):
+    """
+    Test suite for the async book views: they must answer like
+    their DRF counterparts.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="testuser", password="password123")
+        self.author = Author.objects.create(name="Isaac Asimov")
+        self.book1 = Book.objects.create(title="Foundation", publication_year=1951, author=self.author)
+        self.book2 = Book.objects.create(title="I, Robot", publication_year=1950, author=self.author)
+
+    async def test_list_matches_sync_view(self):
+        query = "?search=asimov&ordering=-publication_year&page_size=1"
+        async_response = await self.async_client.get(reverse("async-book-list") + query)
+        sync_response = await self.async_client.get(reverse("book-list") + query)
+
+        self.assertEqual(async_response.status_code, 200)
+        async_data, sync_data = async_response.json(), sync_response.json()
+        self.assertEqual(async_data["results"], sync_data["results"])
+        self.assertEqual(async_data["has_more"], sync_data["has_more"])
+        # Same cursor, each pointing back to its own endpoint
+        self.assertEqual(async_data["next"].replace("/async", ""), sync_data["next"])
+
+    async def test_list_follows_cursor(self):
+        first = (await self.async_client.get(reverse("async-book-list") + "?page_size=1")).json()
+        second = (await self.async_client.get(first["next"])).json()
+
+        self.assertEqual([book["title"] for book in first["results"] + second["results"]], ["Foundation", "I, Robot"])
+        self.assertFalse(second["has_more"])
+
+    async def test_list_rejects_invalid_filter(self):
+        response = await self.async_client.get(reverse("async-book-list") + "?publication_year=soon")
+        self.assertEqual(response.status_code, 400)
+
+    async def test_detail(self):
+        response = await self.async_client.get(reverse("async-book-detail", args=[self.book1.id]))
+        sync_response = await self.async_client.get(reverse("book-detail", args=[self.book1.id]))
+
+        self.assertEqual(response.json(), sync_response.json())
+        missing = await self.async_client.get(reverse("async-book-detail", args=[9999]))
+        self.assertEqual(missing.status_code, 404)
+
+    async def test_create_requires_login(self):
+        data = {"title": "New Book", "publication_year": 2020, "author": self.author.id}
+        response = await self.async_client.post(reverse("async-book-create"), data, content_type="application/json")
+        self.assertEqual(response.status_code, 403)
+
+    async def test_create(self):
+        await self.async_client.alogin(username="testuser", password="password123")
+
+        data = {"title": "New Book", "publication_year": 2020, "author": self.author.id}
+        response = await self.async_client.post(reverse("async-book-create"), data, content_type="application/json")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["title"], "New Book")
+        self.assertEqual(await Book.objects.acount(), 3)
+
+    async def test_create_validates(self):
+        await self.async_client.alogin(username="testuser", password="password123")
+
+        data = {"title": "New Book", "publication_year": 2020, "author": 9999}
+        response = await self.async_client.post(reverse("async-book-create"), data, content_type="application/json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("author", response.json())
@@ -0,0 +1,195 @@
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+from contextlib import closing
+from io import StringIO
+from unittest import skipIf
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import LiveServerTestCase, TestCase, TransactionTestCase, override_settings
+
+from api.messagepack import msgpack
+from api.models import Author, Book
+
+
+class ImportBooksCommandTestCase(TestCase):
+    """
+    Test suite for `manage.py import_books`.
+    """
+
+    def setUp(self):
+        self.asimov = Author.objects.create(name="Isaac Asimov")
+
+    def _write(self, suffix, content):
+        handle, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(handle, "w", encoding="utf-8") as output:
+            output.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def _import(self, *args):
+        out = StringIO()
+        call_command("import_books", *args, stdout=out, stderr=StringIO())
+        return out.getvalue()
+
+    def test_import_ndjson_reuses_and_creates_authors(self):
+        path = self._write(".ndjson", (
+            '{"title": "Foundation", "publication_year": 1951, "author_name": "Isaac Asimov"}\n'
+            '{"title": "Rendezvous with Rama", "publication_year": 1973, "author": "Arthur C. Clarke"}\n'
+            '{"title": "Broken", "publication_year": "soon", "author_name": "Nobody"}\n'
+        ))
+        output = self._import(path, "--chunk-size", "1")
+
+        self.assertIn("Imported 2 books (1 skipped)", output)
+        self.assertEqual(Author.objects.count(), 2)
+        self.assertEqual(self.asimov.books.get().title, "Foundation")
+        self.assertEqual(
+            Book.objects.get(title="Rendezvous with Rama").author.name,
+            "Arthur C. Clarke"
+        )
+
+    def test_import_csv_resumes_from_offset(self):
+        header = "title,publication_year,author_name\n"
+        first = "Foundation,1951,Isaac Asimov\n"
+        path = self._write(".csv", header + first + '"I, Robot",1950,Isaac Asimov\n')
+
+        self._import(path, "--offset", str(len(header) + len(first)))
+
+        self.assertEqual(list(Book.objects.values_list("title", flat=True)), ["I, Robot"])
+
+
+class BenchmarkCompressionCommandTestCase(TestCase):
+    """
+    Test suite for `manage.py benchmark_compression`.
+    """
+
+    def test_reports_every_encoding_and_payload(self):
+        author = Author.objects.create(name="Isaac Asimov")
+        Book.objects.bulk_create(
+            Book(title=f"Foundation {number}", publication_year=1951, author=author) for number in range(50)
+        )
+        handle, path = tempfile.mkstemp(suffix=".json")
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+
+        call_command("benchmark_compression", "--repeat", "2", "--output", path, stdout=StringIO())
+
+        with open(path) as results:
+            report = json.load(results)
+        self.assertEqual(sorted(report["payloads"]), ["batch_50", "list_100", "list_20"])
+        rows = report["payloads"]["list_100"]["results"]
+        self.assertEqual(rows[-1]["encoding"], "gzip (cached)")
+        self.assertIn("gzip", {row["encoding"] for row in rows})
+        self.assertTrue(all(row["bytes"] < report["payloads"]["list_100"]["bytes"] for row in rows))
+
+    def test_requires_books(self):
+        with self.assertRaisesMessage(CommandError, "No books to benchmark"):
+            call_command("benchmark_compression", stdout=StringIO())
+
+
+@skipIf(msgpack is None, "msgpack is not installed")
+class BenchmarkRenderersCommandTestCase(TestCase):
+    """
+    Test suite for `manage.py benchmark_renderers`.
+    """
+
+    def test_compares_json_and_msgpack(self):
+        out = StringIO()
+        call_command("benchmark_renderers", "--rows", "50", "--repeat", "1", stdout=out)
+
+        lines = out.getvalue().splitlines()
+        self.assertEqual([line.split()[1] for line in lines[1:]], ["json", "msgpack"])
+        self.assertFalse(Book.objects.exists())
+
+
+class RefreshReplicaCommandTestCase(TransactionTestCase):
+    """
+    Test suite for `manage.py refresh_replica`. Runs outside a test
+    transaction, like the command itself: the backup can't read the
+    in-memory test database while a transaction holds it.
+    """
+
+    def test_copies_the_primary(self):
+        Author.objects.create(name="Isaac Asimov")
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "replica.sqlite3")
+
+        call_command("refresh_replica", "--to", path, stdout=StringIO())
+
+        with closing(sqlite3.connect(path)) as replica:
+            self.assertEqual(replica.execute("SELECT name FROM api_author").fetchall(), [("Isaac Asimov",)])
+        self.assertEqual(os.listdir(directory), ["replica.sqlite3"])
+
+    def test_requires_a_replica(self):
+        with self.assertRaisesMessage(CommandError, "No replicas configured"):
+            call_command("refresh_replica", stdout=StringIO())
+
+
+class ExplainBookQueriesCommandTestCase(TestCase):
+    """
+    Every filter + ordering combination of BookListView must be
+    served from an index: adding a filter or ordering field without
+    a matching index fails here.
+    """
+
+    def test_no_full_scans_or_sorts(self):
+        out = StringIO()
+        call_command("explain_book_queries", "--strict", stdout=out)
+        self.assertIn("0 combination(s) flagged.", out.getvalue())
+
+
+@override_settings(API_THROTTLE_ENABLED=False)
+class BenchmarkHttpCommandTestCase(LiveServerTestCase):
+    """
+    Test suite for `manage.py benchmark_http`, run against the test
+    live server.
+    """
+
+    def test_writes_json_report(self):
+        handle, path = tempfile.mkstemp(suffix=".json")
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        cache.set("unrelated", "kept")
+
+        call_command(
+            "benchmark_http", "--dataset", "1k", "--noinput", "--clients", "4", "--requests", "10",
+            "--base-url", self.live_server_url, "--output", path, stdout=StringIO(), stderr=StringIO(),
+        )
+
+        with open(path) as report_file:
+            report = json.load(report_file)
+        self.assertEqual(report["books"], 1000)
+        for name in ("read", "mixed"):
+            overall = report["workloads"][name]["all"]
+            self.assertEqual(overall["requests"] + overall["errors"], 40)
+            self.assertEqual(overall["errors"], 0)
+            self.assertIn("p99_ms", overall)
+        self.assertGreater(report["workloads"]["read"]["detail"]["queries_per_request"], 0)
+        self.assertIn("create", report["workloads"]["mixed"])
+        # The cold-cache measurement only invalidates the response cache
+        self.assertEqual(cache.get("unrelated"), "kept")
+
+
+    def test_each_client_deletes_its_own_spare_books(self):
+        author = Author.objects.create(name="Isaac Asimov")
+        Book.objects.bulk_create(
+            Book(title=f"Book {index}", publication_year=1950, author=author) for index in range(4)
+        )
+        handle, path = tempfile.mkstemp(suffix=".json")
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+
+        # ~7 deletes drawn per client, with one spare book each
+        call_command(
+            "benchmark_http", "--workload", "mixed", "--clients", "2", "--requests", "400",
+            "--base-url", self.live_server_url, "--output", path, stdout=StringIO(), stderr=StringIO(),
+        )
+
+        with open(path) as report_file:
+            mixed = json.load(report_file)["workloads"]["mixed"]
+        self.assertEqual(mixed["delete"]["requests"], 2)
+        self.assertEqual(mixed["all"]["errors"], 0)
@@ -0,0 +1,74 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from api import router
+from api.models import Book
+from api.router import PIN_COOKIE, ReplicaPinningMiddleware, ReplicaRouter, use_primary
+
+
+@override_settings(DATABASE_REPLICAS=["replica"], DATABASE_PIN_SECONDS=5)
+class ReplicaRouterTestCase(SimpleTestCase):
+    """
+    Test suite for the read/write router and read-your-writes pinning.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.router = ReplicaRouter()
+        token = router._state.set(None)
+        self.addCleanup(router._state.reset, token)
+
+    def test_reads_go_to_replica_writes_to_primary(self):
+        self.assertEqual(self.router.db_for_read(Book), "replica")
+        self.assertEqual(self.router.db_for_write(Book), "default")
+        self.assertFalse(self.router.allow_migrate("replica", "api"))
+
+        with override_settings(DATABASE_REPLICAS=[]):
+            self.assertEqual(self.router.db_for_read(Book), "default")
+
+    def test_reads_stay_on_primary_for_the_window_after_a_write(self):
+        with mock.patch("api.router.time.time", return_value=1000.0):
+            self.router.db_for_write(Book)
+            self.assertEqual(self.router.db_for_read(Book), "default")
+        with mock.patch("api.router.time.time", return_value=1006.0):
+            self.assertEqual(self.router.db_for_read(Book), "replica")
+
+    def test_use_primary(self):
+        with use_primary():
+            self.assertEqual(self.router.db_for_read(Book), "default")
+        self.assertEqual(self.router.db_for_read(Book), "replica")
+
+    def _request(self, method="get", write=False, **extra):
+        reads = []
+
+        def view(request):
+            if write:
+                self.router.db_for_write(Book)
+            reads.append(self.router.db_for_read(Book))
+            return HttpResponse()
+
+        request = getattr(RequestFactory(), method)("/api/books/", **extra)
+        response = ReplicaPinningMiddleware(view)(request)
+        return reads[0], response
+
+    def test_unsafe_requests_read_from_primary(self):
+        self.assertEqual(self._request()[0], "replica")
+        self.assertEqual(self._request("post")[0], "default")
+
+    def test_client_is_pinned_after_its_write(self):
+        read, response = self._request("post", write=True)
+        self.assertEqual(response.cookies[PIN_COOKIE]["max-age"], 5)
+
+        # Cookie clients
+        self.assertEqual(self._request(HTTP_COOKIE=f"{PIN_COOKIE}=1")[0], "default")
+        self.assertEqual(self._request()[0], "replica")
+
+    def test_token_client_is_pinned_after_its_write(self):
+        self._request("post", write=True, HTTP_AUTHORIZATION="Token abc")
+
+        self.assertEqual(self._request(HTTP_AUTHORIZATION="Token abc")[0], "default")
+        self.assertEqual(self._request(HTTP_AUTHORIZATION="Token other")[0], "replica")
+        self.assertNotIn(PIN_COOKIE, self._request(HTTP_AUTHORIZATION="Token abc")[1].cookies)
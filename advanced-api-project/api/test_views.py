@@ -1,8 +1,31 @@
-from rest_framework.test import APITestCase, APIClient
-from rest_framework import status
+import base64
+import csv
+import gzip
+import io
+import json
+
+from rest_framework.test import APITestCase, APIClient, APIRequestFactory
+from rest_framework import generics, status
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from unittest import mock, skipIf
 from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from api import search
+from api.autocomplete import index as autocomplete_index
+from api.cache import bump_version
+from api.compression import ENCODERS, choose_encoding
+from api.conditional import ConditionalGetMixin
+from api.fast import FastRepresentation
+from api.log import JsonFormatter
+from api.messagepack import msgpack
 from api.models import Author, Book
+from api.pagination import BookCursorPagination
+from api.serializers import AuthorSerializer, BookSerializer
+from api.views import BookListView
 
 
 class BookAPITestCase(APITestCase):
@@ -13,6 +36,9 @@ class BookAPITestCase(APITestCase):
     """
 
     def setUp(self):
+        # Response cache outlives a test's database transaction
+        cache.clear()
+
         # Create user for authenticated tests
         self.user = User.objects.create_user(
             username="testuser",
@@ -52,7 +78,7 @@ class BookAPITestCase(APITestCase):
         response = self.client.get(url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 3)
+        self.assertEqual(len(response.data["results"]), 3)
 
     def test_retrieve_single_book(self):
         """Anyone can retrieve a single book."""
@@ -92,6 +118,77 @@ class BookAPITestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(Book.objects.count(), 4)
 
+    def test_create_book_logs_event(self):
+        self.client.login(username="testuser", password="password123")
+
+        data = {"title": "New Book", "publication_year": 2020, "author": self.author1.id}
+        with self.assertLogs("api.books", "INFO") as logs:
+            response = self.client.post(reverse("book-create"), data)
+
+        event = logs.records[0].event
+        self.assertEqual(event["book_id"], response.data["id"])
+        self.assertEqual(event["fields"], ["author", "publication_year", "title"])
+
+    def test_bulk_create_books(self):
+        self.client.login(username="testuser", password="password123")
+
+        url = reverse("book-create") + "?batch_size=2"
+        data = [
+            {"title": "Rendezvous with Rama", "publication_year": 1973, "author": self.author2.id},
+            {"title": "The Gods Themselves", "publication_year": 1972, "author": self.author1.id},
+            {"title": "Imperial Earth", "publication_year": 1975, "author": self.author2.id},
+        ]
+        response = self.client.post(url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 3)
+        self.assertEqual(response.data["errors"], [])
+        self.assertEqual(Book.objects.count(), 6)
+        search = self.client.get(reverse("book-list") + "?search=rama").data["results"]
+        self.assertEqual([book["title"] for book in search], ["Rendezvous with Rama"])
+
+    def test_bulk_create_rejects_batch_with_invalid_item(self):
+        self.client.login(username="testuser", password="password123")
+
+        data = [
+            {"title": "Rendezvous with Rama", "publication_year": 1973, "author": self.author2.id},
+            {"title": "No Author", "publication_year": 1972, "author": 9999},
+        ]
+        response = self.client.post(reverse("book-create"), data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertIn("author", response.data[1])
+        self.assertEqual(Book.objects.count(), 3)
+
+    def test_bulk_create_rejects_unhashable_author(self):
+        self.client.login(username="testuser", password="password123")
+
+        data = [
+            {"title": "A", "publication_year": 2000, "author": [self.author1.id]},
+            {"title": "B", "publication_year": 2000, "author": {"a": 1}},
+        ]
+        response = self.client.post(reverse("book-create"), data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("author", response.data[0])
+        self.assertIn("author", response.data[1])
+
+    def test_bulk_create_partial_keeps_valid_items(self):
+        self.client.login(username="testuser", password="password123")
+
+        data = [
+            {"title": "Rendezvous with Rama", "publication_year": 1973, "author": self.author2.id},
+            {"title": "No Year", "author": self.author1.id},
+        ]
+        response = self.client.post(reverse("book-create") + "?partial=true", data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual(response.data["errors"][0]["index"], 1)
+        self.assertIn("publication_year", response.data["errors"][0]["errors"])
+        self.assertEqual(Book.objects.count(), 4)
+
     # ---------------------------------------------------
     # UPDATE TESTS
     # ---------------------------------------------------
@@ -114,6 +211,23 @@ class BookAPITestCase(APITestCase):
         self.book1.refresh_from_db()
         self.assertEqual(self.book1.title, "Updated Title")
 
+    def test_update_logs_changed_fields(self):
+        self.client.login(username="testuser", password="password123")
+
+        url = reverse("book-update", args=[self.book1.id])
+        data = {"title": "Updated Title", "publication_year": self.book1.publication_year}
+        with self.assertLogs("api.books", "INFO") as logs:
+            self.client.patch(url, data)
+
+        event = logs.records[0].event
+        self.assertEqual(logs.records[0].getMessage(), "book.updated")
+        self.assertEqual(event["book_id"], self.book1.id)
+        self.assertEqual(event["fields"], ["title"])
+
+        line = json.loads(JsonFormatter().format(logs.records[0]))
+        self.assertEqual(line["fields"], ["title"])
+        self.assertIn("save_ms", line)
+
     # ---------------------------------------------------
     # DELETE TESTS
     # ---------------------------------------------------
@@ -132,6 +246,217 @@ class BookAPITestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertEqual(Book.objects.count(), 2)
 
+    # ---------------------------------------------------
+    # FACET TESTS
+    # ---------------------------------------------------
+
+    def test_facets_follow_search(self):
+        url = reverse("book-list") + "?search=asimov&facets=author,publication_year"
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+
+        facets = response.data["facets"]
+        self.assertEqual(facets["author"], [{"value": self.author1.id, "label": "Isaac Asimov", "count": 2}])
+        self.assertEqual(
+            facets["publication_year"],
+            [{"value": 1950, "count": 1}, {"value": 1951, "count": 1}]
+        )
+
+    def test_facets_are_capped(self):
+        for year in range(1960, 1980):
+            Book.objects.create(title=f"Book {year}", publication_year=year, author=self.author2)
+
+        response = self.client.get(reverse("book-list") + "?facets=publication_year")
+        self.assertEqual(len(response.data["facets"]["publication_year"]), 10)
+
+    def test_unknown_facet_is_rejected(self):
+        response = self.client.get(reverse("book-list") + "?facets=title")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    # ---------------------------------------------------
+    # SPARSE FIELDSET TESTS
+    # ---------------------------------------------------
+
+    def test_list_sparse_fields(self):
+        url = reverse("book-list") + "?fields=id,title"
+        response = self.client.get(url)
+
+        self.assertEqual(response.data["results"][0], {"id": self.book3.id, "title": "Childhood's End"})
+
+    def test_list_exclude_fields(self):
+        url = reverse("book-list") + "?exclude=updated_at,author&ordering=-publication_year&page_size=1"
+        first = self.client.get(url)
+        second = self.client.get(first.data["next"])
+
+        self.assertEqual(list(first.data["results"][0]), ["id", "title", "publication_year"])
+        self.assertEqual(second.data["results"][0]["title"], "Foundation")
+
+    def test_detail_sparse_fields_query_narrow_columns(self):
+        url = reverse("book-detail", args=[self.book1.id]) + "?fields=title"
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+
+        self.assertEqual(response.data, {"title": "Foundation"})
+        self.assertNotIn("publication_year", queries.captured_queries[-1]["sql"])
+
+    def test_detail_etag_depends_on_sparse_fields(self):
+        url = reverse("book-detail", args=[self.book1.id])
+        full = self.client.get(url)
+        sparse = self.client.get(url + "?fields=id")
+
+        self.assertNotEqual(full["ETag"], sparse["ETag"])
+        response = self.client.get(url + "?fields=id", HTTP_IF_NONE_MATCH=full["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(url + "?fields=id,id", HTTP_IF_NONE_MATCH=sparse["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_unknown_sparse_field_is_rejected(self):
+        response = self.client.get(reverse("book-list") + "?fields=title,isbn")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_sparse_fieldsets_are_normalized(self):
+        """Duplicates and client order don't create new compiled fieldsets."""
+        url = reverse("book-list")
+        self.client.get(url + "?fields=title,id")
+        compiled = len(FastRepresentation._compiled)
+        for fields in ("id,title", "id,title,id", "title,title,id,id"):
+            response = self.client.get(url + f"?fields={fields}")
+            self.assertEqual(list(response.data["results"][0]), ["id", "title"])
+        self.assertEqual(len(FastRepresentation._compiled), compiled)
+
+    def test_empty_sparse_fieldset_is_rejected(self):
+        response = self.client.get(reverse("book-list") + "?exclude=id,title,publication_year,author,updated_at")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(reverse("book-list") + "?fields=,")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    # ---------------------------------------------------
+    # BATCH RETRIEVAL TESTS
+    # ---------------------------------------------------
+
+    def test_batch_by_ids_keeps_order_and_reports_missing(self):
+        ids = f"{self.book3.id},999,{self.book1.id},{self.book3.id}"
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("book-list") + f"?ids={ids}&fields=id,title")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {
+            "results": [
+                {"id": self.book3.id, "title": "Childhood's End"},
+                {"id": self.book1.id, "title": "Foundation"},
+            ],
+            "missing": [999],
+        })
+
+    def test_batch_post_matches_get(self):
+        ids = [self.book2.id, self.book1.id]
+        response = self.client.post(reverse("book-batch"), {"ids": ids}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"], [BookSerializer(self.book2).data, BookSerializer(self.book1).data])
+        self.assertEqual(response.data, self.client.get(reverse("book-list") + "?ids=" + ",".join(map(str, ids))).data)
+
+    def test_batch_rejects_invalid_and_oversized_requests(self):
+        self.assertEqual(self.client.get(reverse("book-list") + "?ids=1,abc").status_code, 400)
+        self.assertEqual(self.client.post(reverse("book-batch"), {"ids": {"id": 1}}, format="json").status_code, 400)
+        with override_settings(API_BATCH_MAX_IDS=2):
+            response = self.client.post(reverse("book-batch"), {"ids": [1, 2, 3]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    # ---------------------------------------------------
+    # EXPORT TESTS
+    # ---------------------------------------------------
+
+    def test_export_ndjson(self):
+        response = self.client.get(reverse("book-export"))
+
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual([row["title"] for row in rows], ["Foundation", "I, Robot", "Childhood's End"])
+        self.assertEqual(rows[0]["author_name"], "Isaac Asimov")
+
+    def test_export_csv_with_search(self):
+        url = reverse("book-export") + "?output=csv&search=asimov&ordering=publication_year"
+        response = self.client.get(url)
+
+        self.assertEqual(response["Content-Type"], "text/csv")
+        rows = list(csv.reader(io.StringIO(b"".join(response.streaming_content).decode())))
+        self.assertEqual(rows[0], ["id", "title", "publication_year", "updated_at", "author", "author_name"])
+        self.assertEqual([row[1] for row in rows[1:]], ["I, Robot", "Foundation"])
+
+    def test_export_rejects_unknown_output(self):
+        response = self.client.get(reverse("book-export") + "?output=xml")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    # ---------------------------------------------------
+    # BULK UPDATE / DELETE TESTS
+    # ---------------------------------------------------
+
+    def test_unauthenticated_bulk_update_fails(self):
+        url = reverse("book-bulk-update") + f"?author={self.author1.id}"
+        response = self.client.patch(url, {"publication_year": 2000}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_bulk_update_requires_filter(self):
+        self.client.login(username="testuser", password="password123")
+        response = self.client.patch(reverse("book-bulk-update"), {"publication_year": 2000}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_endpoints_reject_empty_filters(self):
+        """?title= is ignored by the filterset, so it must not count as a filter."""
+        self.client.login(username="testuser", password="password123")
+
+        url = reverse("book-bulk-update") + "?title=&author="
+        response = self.client.patch(url, {"title": "x"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.delete(reverse("book-bulk-delete") + "?title=")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Book.objects.count(), 3)
+        self.assertFalse(Book.objects.filter(title="x").exists())
+
+    def test_bulk_update_by_author(self):
+        self.client.login(username="testuser", password="password123")
+
+        url = reverse("book-bulk-update") + f"?author={self.author1.id}"
+        response = self.client.patch(url, {"author": self.author2.id}, format="json")
+
+        self.assertEqual(response.data["updated"], 2)
+        self.assertEqual(self.author2.books.count(), 3)
+        search = self.client.get(reverse("book-list") + "?search=clarke robot").data["results"]
+        self.assertEqual([book["title"] for book in search], ["I, Robot"])
+
+    def test_bulk_update_validates_body(self):
+        self.client.login(username="testuser", password="password123")
+
+        url = reverse("book-bulk-update") + f"?author={self.author1.id}"
+        response = self.client.patch(url, {"author": 9999}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.author1.books.count(), 2)
+
+    def test_bulk_update_dry_run(self):
+        self.client.login(username="testuser", password="password123")
+
+        url = reverse("book-bulk-update") + "?publication_year=1951&dry_run=true"
+        response = self.client.patch(url, {"title": "Renamed"}, format="json")
+
+        self.assertEqual(response.data, {"matched": 1, "updated": 0, "dry_run": True})
+        self.book1.refresh_from_db()
+        self.assertEqual(self.book1.title, "Foundation")
+
+    def test_bulk_delete_by_author(self):
+        self.client.login(username="testuser", password="password123")
+
+        url = reverse("book-bulk-delete") + f"?author={self.author1.id}"
+        dry_run = self.client.delete(url + "&dry_run=true")
+        response = self.client.delete(url)
+
+        self.assertEqual(dry_run.data["matched"], 2)
+        self.assertEqual(response.data["deleted"], 2)
+        self.assertEqual(list(Book.objects.values_list("title", flat=True)), ["Childhood's End"])
+
     # ---------------------------------------------------
     # FILTERING, SEARCH, ORDERING TESTS
     # ---------------------------------------------------
@@ -140,28 +465,726 @@ class BookAPITestCase(APITestCase):
         url = reverse("book-list") + "?title=Foundation"
         response = self.client.get(url)
 
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["title"], "Foundation")
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["title"], "Foundation")
 
     def test_filter_by_author(self):
         url = reverse("book-list") + f"?author={self.author2.id}"
         response = self.client.get(url)
 
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["title"], "Childhood's End")
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["title"], "Childhood's End")
 
     def test_search_books(self):
         """Search across title + author name."""
         url = reverse("book-list") + "?search=robot"
         response = self.client.get(url)
 
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["title"], "I, Robot")
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["title"], "I, Robot")
 
     def test_order_books(self):
         """Test ordering by publication_year descending."""
         url = reverse("book-list") + "?ordering=-publication_year"
         response = self.client.get(url)
 
-        years = [book["publication_year"] for book in response.data]
+        years = [book["publication_year"] for book in response.data["results"]]
         self.assertEqual(years, sorted(years, reverse=True))
+
+    def test_only_the_first_ordering_field_is_used(self):
+        url = reverse("book-list")
+        expected = self.client.get(url + "?ordering=-publication_year")
+        response = self.client.get(url + "?ordering=-publication_year,title")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [book["id"] for book in response.data["results"]],
+            [book["id"] for book in expected.data["results"]],
+        )
+
+    # ---------------------------------------------------
+    # PAGINATION TESTS
+    # ---------------------------------------------------
+
+    def _walk_pages(self, url):
+        titles = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            titles += [book["title"] for book in response.data["results"]]
+            url = response.data["next"]
+        return titles
+
+    def test_paginate_books_by_title(self):
+        """Cursor pages follow the default title ordering."""
+        url = reverse("book-list") + "?page_size=2"
+        response = self.client.get(url)
+
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertIsNone(response.data["previous"])
+        self.assertIsNotNone(response.data["next"])
+        self.assertEqual(
+            self._walk_pages(url),
+            ["Childhood's End", "Foundation", "I, Robot"]
+        )
+
+    def test_paginate_books_breaks_ties_on_id(self):
+        """Books sharing a publication year are neither skipped nor repeated."""
+        Book.objects.create(title="Second Foundation", publication_year=1953, author=self.author1)
+        Book.objects.create(title="Prelude to Foundation", publication_year=1953, author=self.author1)
+
+        url = reverse("book-list") + "?ordering=-publication_year&page_size=1"
+        titles = self._walk_pages(url)
+
+        self.assertEqual(len(titles), 5)
+        # Ties follow the direction of the ordering: newest id first
+        self.assertEqual(titles[:3], ["Prelude to Foundation", "Second Foundation", "Childhood's End"])
+
+    def test_paginate_books_previous_link(self):
+        """The previous link returns the page before the current one."""
+        url = reverse("book-list") + "?page_size=1"
+        first = self.client.get(url)
+        second = self.client.get(first.data["next"])
+        back = self.client.get(second.data["previous"])
+
+        self.assertEqual(back.data["results"], first.data["results"])
+        self.assertIsNone(back.data["previous"])
+
+    def test_paginate_filtered_books(self):
+        """Cursor pagination combines with filtering."""
+        url = reverse("book-list") + f"?author={self.author1.id}&page_size=1"
+        self.assertEqual(self._walk_pages(url), ["Foundation", "I, Robot"])
+
+    def test_paginate_books_has_more(self):
+        url = reverse("book-list") + "?page_size=2"
+        first = self.client.get(url)
+        last = self.client.get(first.data["next"])
+
+        self.assertTrue(first.data["has_more"])
+        self.assertFalse(last.data["has_more"])
+        self.assertNotIn("count", first.data)
+
+    def test_paginate_books_exact_count(self):
+        url = reverse("book-list") + f"?author={self.author1.id}&count=true&page_size=1"
+        response = self.client.get(url)
+
+        self.assertEqual(response.data["count"], 2)
+        self.assertTrue(response.data["count_is_exact"])
+
+    def test_paginate_books_estimated_count(self):
+        Book.objects.bulk_create(
+            Book(title=f"Book {index}", publication_year=2000 + index % 2, author=self.author2)
+            for index in range(400)
+        )
+        paginator = BookCursorPagination()
+        paginator.model = Book
+        paginator.count_threshold = 50
+        paginator.count_sample_size = 100
+
+        count, exact = paginator.get_count(Book.objects.filter(publication_year=2000))
+
+        self.assertFalse(exact)
+        self.assertGreater(count, 50)
+        self.assertLess(abs(count - 200), 60)
+
+    def test_estimated_count_follows_matches_clustered_by_id(self):
+        """A recent import (the highest ids) is not missed by the sample."""
+        Book.objects.bulk_create(
+            Book(title=f"Book {index}", publication_year=2000 if index >= 1700 else 1990, author=self.author2)
+            for index in range(2000)
+        )
+        paginator = BookCursorPagination()
+        paginator.model = Book
+        paginator.count_threshold = 50
+        paginator.count_sample_size = 200
+
+        count, exact = paginator.get_count(Book.objects.filter(publication_year=2000))
+
+        self.assertFalse(exact)
+        self.assertLess(abs(count - 300), 60)
+
+    def test_invalid_cursor_returns_404(self):
+        url = reverse("book-list") + "?cursor=not-a-cursor"
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_values_must_fit_their_columns(self):
+        def cursor(position):
+            return base64.b64encode(json.dumps({"r": 0, "p": position}).encode()).decode()
+
+        url = reverse("book-list")
+        for ordering, position in [
+            ("-publication_year", ["1951", 1]),  # coerced
+            ("-publication_year", ["soon", 1]),
+            ("-publication_year", [1951, None]),
+            ("title", [["Foundation"], {"id": 1}]),
+        ]:
+            response = self.client.get(url, {"ordering": ordering, "cursor": cursor(position)})
+            expected = status.HTTP_200_OK if position[0] == "1951" else status.HTTP_404_NOT_FOUND
+            self.assertEqual(response.status_code, expected, position)
+
+        response = self.client.get(url, {"search": "foundation", "cursor": cursor(["best", 1])})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    # ---------------------------------------------------
+    # FULL-TEXT SEARCH TESTS
+    # ---------------------------------------------------
+
+    def test_search_matches_word_prefixes(self):
+        url = reverse("book-list") + "?search=asim found"
+        response = self.client.get(url)
+
+        titles = [book["title"] for book in response.data["results"]]
+        self.assertEqual(titles, ["Foundation"])
+
+    def test_search_ranks_by_relevance(self):
+        """Books matching in more places come first."""
+        Book.objects.create(title="Clarke on Clarke", publication_year=1990, author=self.author2)
+
+        url = reverse("book-list") + "?search=clarke"
+        response = self.client.get(url)
+
+        titles = [book["title"] for book in response.data["results"]]
+        self.assertEqual(titles, ["Clarke on Clarke", "Childhood's End"])
+
+    def test_paginate_search_results(self):
+        """The cursor also works on the relevance ordering."""
+        Book.objects.create(title="Clarke on Clarke", publication_year=1990, author=self.author2)
+
+        url = reverse("book-list") + "?search=clarke&page_size=1"
+        self.assertEqual(self._walk_pages(url), ["Clarke on Clarke", "Childhood's End"])
+
+    def test_search_with_explicit_ordering(self):
+        url = reverse("book-list") + "?search=asimov&ordering=publication_year"
+        response = self.client.get(url)
+
+        titles = [book["title"] for book in response.data["results"]]
+        self.assertEqual(titles, ["I, Robot", "Foundation"])
+
+    def test_search_index_follows_updates_and_deletes(self):
+        self.book1.title = "Foundation and Empire"
+        self.book1.save()
+        self.book2.delete()
+        self.author1.name = "Paul French"
+        self.author1.save()
+
+        url = reverse("book-list")
+        empire = self.client.get(url + "?search=empire french").data["results"]
+        robot = self.client.get(url + "?search=robot").data["results"]
+
+        self.assertEqual([book["title"] for book in empire], ["Foundation and Empire"])
+        self.assertEqual(robot, [])
+
+    def test_search_with_quotes_is_not_an_error(self):
+        url = reverse("book-list") + '?search="robot'
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_search_runs_the_match_once_per_query(self):
+        """The MATCH drives every search query; it is never re-run per book."""
+        books = Book.objects.bulk_create(
+            Book(title=f"Robot {index}", publication_year=2000, author=self.author2)
+            for index in range(40)
+        )
+        search.index_books([(book.pk, book.title, self.author2.name) for book in books])
+
+        # Plans don't depend on the number of rows (no ANALYZE stats)
+        list_url = reverse("book-list")
+        for params in (
+            "?search=robot&count=true&facets=author",
+            f"?search=robot&author={self.author2.id}&count=true",
+            f"?search=robot&author={self.author2.id}&ordering=title",
+        ):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(list_url + params)
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            matching = [query["sql"] for query in queries if "MATCH" in query["sql"]]
+            self.assertTrue(matching)
+            for sql in matching:
+                self.assertEqual(sql.count("MATCH"), 1, sql)
+                with connection.cursor() as cursor:
+                    cursor.execute("EXPLAIN QUERY PLAN " + sql)
+                    plan = [row[-1] for row in cursor.fetchall() if "api_book" in row[-1]]
+                # The full-text scan is the outer loop, api_book is read by pk
+                self.assertTrue(plan[0].startswith("SCAN api_book_fts"), plan)
+                self.assertNotIn("CORRELATED", " ".join(plan))
+
+        response = self.client.get(list_url + "?search=robot")
+        self.assertEqual(response.data["results"][0]["title"], "I, Robot")
+
+    # ---------------------------------------------------
+    # RESPONSE CACHE TESTS
+    # ---------------------------------------------------
+
+    def test_list_response_is_cached(self):
+        url = reverse("book-list") + "?ordering=title&author=" + str(self.author1.id)
+        first = self.client.get(url)
+        second = self.client.get(reverse("book-list") + f"?author={self.author1.id}&ordering=title")
+
+        self.assertEqual(first["X-Cache"], "MISS")
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(first.data, second.data)
+
+    def test_orm_write_outside_the_api_changes_list_etag(self):
+        """Admin / shell saves bump the version through the signal receivers."""
+        url = reverse("book-list")
+        first = self.client.get(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book1.title = "Foundation and Empire"
+            self.book1.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["X-Cache"], "MISS")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book2.delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(len(response.data["results"]), 2)
+
+    def test_author_rename_invalidates_book_responses(self):
+        url = reverse("book-list") + "?search=asimov&facets=author"
+        first = self.client.get(url)
+        self.assertEqual(self.client.get(url)["X-Cache"], "HIT")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.author1.name = "Paul French"
+            self.author1.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["results"], [])
+
+    def test_write_invalidates_cached_responses(self):
+        self.client.login(username="testuser", password="password123")
+        list_url = reverse("book-list")
+        detail_url = reverse("book-detail", args=[self.book1.id])
+        self.client.get(list_url)
+        self.client.get(detail_url)
+
+        # The version is bumped once the write commits
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("book-create"), {
+                "title": "New Book",
+                "publication_year": 2020,
+                "author": self.author1.id
+            })
+        listing = self.client.get(list_url)
+        detail = self.client.get(detail_url)
+
+        self.assertEqual(listing["X-Cache"], "MISS")
+        self.assertEqual(len(listing.data["results"]), 4)
+        self.assertEqual(detail["X-Cache"], "MISS")
+
+    def test_cache_stats_require_staff(self):
+        self.client.get(reverse("book-list"))
+        self.client.get(reverse("book-list"))
+
+        response = self.client.get(reverse("cache-stats"))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        User.objects.create_superuser(username="admin", password="password123")
+        self.client.login(username="admin", password="password123")
+        response = self.client.get(reverse("cache-stats"))
+        self.assertEqual(response.data["BookListView"], {"hits": 1, "misses": 1})
+
+    # ---------------------------------------------------
+    # CONDITIONAL GET TESTS
+    # ---------------------------------------------------
+
+    def test_detail_not_modified(self):
+        url = reverse("book-detail", args=[self.book1.id])
+        response = self.client.get(url)
+        self.assertIn("ETag", response)
+        self.assertIn("Last-Modified", response)
+
+        by_etag = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        by_date = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+
+        self.assertEqual(by_etag.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(by_date.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_detail_etag_changes_after_update(self):
+        url = reverse("book-detail", args=[self.book1.id])
+        etag = self.client.get(url)["ETag"]
+
+        self.book1.title = "Foundation and Empire"
+        self.book1.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_bare_conditional_mixin_serves_plain_gets(self):
+        class BareView(ConditionalGetMixin, generics.RetrieveAPIView):
+            queryset = Book.objects.all()
+            serializer_class = BookSerializer
+
+        request = APIRequestFactory().get("/", HTTP_IF_NONE_MATCH="*")
+        response = BareView.as_view()(request, pk=self.book1.id)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("ETag", response)
+        self.assertNotIn("Last-Modified", response)
+
+    def test_list_etag_changes_after_write(self):
+        self.client.login(username="testuser", password="password123")
+        url = reverse("book-list") + "?ordering=title"
+        etag = self.client.get(url)["ETag"]
+
+        self.assertEqual(
+            self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code,
+            status.HTTP_304_NOT_MODIFIED
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("book-create"), {
+                "title": "New Book",
+                "publication_year": 2020,
+                "author": self.author1.id
+            })
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("Last-Modified", response)
+
+    def test_list_etag_depends_on_query(self):
+        url = reverse("book-list")
+        plain = self.client.get(url)["ETag"]
+        filtered = self.client.get(url + "?title=Foundation")["ETag"]
+        self.assertNotEqual(plain, filtered)
+
+    # ---------------------------------------------------
+    # FAST READ PATH TESTS
+    # ---------------------------------------------------
+
+    def test_fast_representation_is_byte_identical(self):
+        fast = FastRepresentation.for_serializer(BookSerializer)
+        queryset = Book.objects.order_by("id")
+
+        expected = JSONRenderer().render(BookSerializer(queryset, many=True).data)
+        actual = JSONRenderer().render(fast.serialize(queryset.values(*fast.columns)))
+        self.assertEqual(actual, expected)
+
+    def test_fast_list_matches_serializer_list(self):
+        url = reverse("book-list") + "?search=asimov&page_size=1"
+        fast = self.client.get(url).content
+
+        cache.clear()
+        BookListView.fast_list = False
+        try:
+            slow = self.client.get(url).content
+        finally:
+            BookListView.fast_list = True
+        self.assertEqual(fast, slow)
+
+    def test_nested_serializer_is_not_compiled(self):
+        self.assertIsNone(FastRepresentation.for_serializer(AuthorSerializer))
+
+
+class AuthorAPITestCase(APITestCase):
+    """
+    Test suite for the Author API endpoints:
+    nested books, capping and query counts.
+    """
+
+    def setUp(self):
+        self.author1 = Author.objects.create(name="Isaac Asimov")
+        self.author2 = Author.objects.create(name="Arthur C. Clarke")
+        for year in range(1950, 1965):
+            Book.objects.create(title=f"Asimov {year}", publication_year=year, author=self.author1)
+        Book.objects.create(title="Childhood's End", publication_year=1953, author=self.author2)
+
+    def test_list_authors_with_capped_books(self):
+        url = reverse("author-list") + "?books=3"
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        clarke, asimov = response.data["results"]
+        self.assertEqual(asimov["book_count"], 15)
+        self.assertEqual(
+            [book["publication_year"] for book in asimov["books"]],
+            [1964, 1963, 1962]
+        )
+        self.assertEqual(clarke["book_count"], 1)
+        self.assertEqual(len(clarke["books"]), 1)
+
+    def test_books_cap_cannot_exceed_setting(self):
+        url = reverse("author-detail", args=[self.author1.id]) + "?books=1000"
+        response = self.client.get(url)
+
+        self.assertEqual(response.data["book_count"], 15)
+        self.assertEqual(len(response.data["books"]), 10)
+
+
+def throttle_rates(**rates):
+    return override_settings(REST_FRAMEWORK={
+        "DEFAULT_THROTTLE_CLASSES": ["api.throttling.TokenBucketThrottle"],
+        "DEFAULT_THROTTLE_RATES": {scope.replace("_", "-"): rate for scope, rate in rates.items()},
+    })
+
+
+class ThrottleTestCase(APITestCase):
+    """
+    Test suite for the token-bucket throttle.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="testuser", password="password123")
+        author = Author.objects.create(name="Isaac Asimov")
+        self.book = Book.objects.create(title="Foundation", publication_year=1951, author=author)
+        self.url = reverse("book-list")
+
+    @throttle_rates(book_list="3/min")
+    def test_over_limit_gets_429_with_retry_after(self):
+        for _ in range(3):
+            self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response["Retry-After"], "20")  # one token per 20s
+
+    @throttle_rates(book_list="6/min")
+    def test_search_costs_more_tokens(self):
+        self.assertEqual(self.client.get(self.url + "?search=foundation").status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
+        response = self.client.get(self.url + "?ordering=title")
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response["Retry-After"], "20")  # short of 2 tokens, 1 token per 10s
+
+    @throttle_rates(book_list="60/min")
+    def test_bucket_refills_over_time(self):
+        with mock.patch("api.throttling.time.time", return_value=1000.0):
+            for _ in range(60):
+                self.client.get(self.url)
+            self.assertEqual(self.client.get(self.url).status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+        with mock.patch("api.throttling.time.time", return_value=1002.0):
+            self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+            self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+            self.assertEqual(self.client.get(self.url).status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @throttle_rates(book_list="1/min")
+    def test_throttling_can_be_turned_off(self):
+        with self.settings(API_THROTTLE_ENABLED=False):
+            for _ in range(3):
+                self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
+    @throttle_rates(book_list="1/min")
+    def test_buckets_are_per_client_and_scope(self):
+        self.client.get(self.url)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+        # Another scope (no rate configured) and another client
+        self.assertEqual(self.client.get(reverse("book-detail", args=[self.book.id])).status_code, status.HTTP_200_OK)
+        self.client.login(username="testuser", password="password123")
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
+    @throttle_rates(book_list="10/min")
+    def test_throttle_does_not_query_the_database(self):
+        self.client.get(self.url)  # warm the response cache
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+
+class BookAutocompleteTestCase(APITestCase):
+    """
+    Test suite for the title autocomplete endpoint and its
+    in-memory index.
+    """
+
+    def setUp(self):
+        cache.clear()
+        autocomplete_index.reset()
+        self.addCleanup(autocomplete_index.reset)
+        self.user = User.objects.create_user(username="testuser", password="password123")
+        self.author = Author.objects.create(name="Isaac Asimov")
+        for title in ["Foundation and Empire", "Foundation", "Forward the Foundation", "Éclipse", "I, Robot"]:
+            Book.objects.create(title=title, publication_year=1950, author=self.author)
+        self.url = reverse("book-autocomplete")
+
+    def _titles(self, query):
+        response = self.client.get(self.url, query)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [match["title"] for match in response.data["results"]]
+
+    def test_prefix_matches_in_title_order(self):
+        self.assertEqual(self._titles({"q": "found"}), ["Foundation", "Foundation and Empire"])
+        self.assertEqual(self._titles({"q": "FOUNDATION  A"}), ["Foundation and Empire"])
+        self.assertEqual(self._titles({"q": "ecl"}), ["Éclipse"])
+        self.assertEqual(self._titles({"q": "fo", "limit": 2}), ["Forward the Foundation", "Foundation"])
+        self.assertEqual(self._titles({"q": ""}), [])
+
+    def test_answers_without_database_queries(self):
+        self._titles({"q": "f"})  # builds the index
+        with self.assertNumQueries(0):
+            self.assertEqual(len(self._titles({"q": "f"})), 3)
+
+    def test_writes_update_the_index(self):
+        self._titles({"q": "f"})
+        self.client.login(username="testuser", password="password123")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("book-create"), {"title": "Fahrenheit 451", "publication_year": 1953, "author": self.author.id}
+            )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(reverse("book-update", args=[response.data["id"]]), {"title": "Fahrenheit"})
+        foundation = Book.objects.get(title="Foundation")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(reverse("book-delete", args=[foundation.id]))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("book-create"), [
+                {"title": "Fallen Angels", "publication_year": 1990, "author": self.author.id},
+            ], format="json")
+
+        self.assertEqual(
+            self._titles({"q": "f"}),
+            ["Fahrenheit", "Fallen Angels", "Forward the Foundation", "Foundation and Empire"]
+        )
+
+    def test_rolled_back_writes_are_ignored(self):
+        self._titles({"q": "f"})
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    Book.objects.create(title="Fiasco", publication_year=1986, author=self.author)
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertNotIn("Fiasco", self._titles({"q": "fi"}))
+
+    @override_settings(API_AUTOCOMPLETE_REFRESH=0)
+    def test_stale_index_is_rebuilt(self):
+        self._titles({"q": "f"})
+        Book.objects.filter(title="Foundation").update(title="Fiasco")  # no signals
+
+        class InlineThread:
+            def __init__(self, target, daemon):
+                pass
+
+            def start(self):
+                autocomplete_index._build()
+
+        with mock.patch("api.autocomplete.threading.Thread", InlineThread):
+            self._titles({"q": "f"})  # triggers the rebuild
+            self.assertEqual(self._titles({"q": "fi"}), ["Fiasco"])
+
+
+class CompressionTestCase(APITestCase):
+    """
+    Test suite for CompressionMiddleware and its reuse of
+    compressed bodies for cached responses.
+    """
+
+    def setUp(self):
+        cache.clear()
+        author = Author.objects.create(name="Isaac Asimov")
+        Book.objects.bulk_create(
+            Book(title=f"Foundation {number}", publication_year=1951, author=author) for number in range(30)
+        )
+        self.url = reverse("book-list") + "?page_size=30"
+
+    def test_choose_encoding(self):
+        self.assertEqual(choose_encoding("gzip, deflate", ["br", "gzip"]), "gzip")
+        self.assertEqual(choose_encoding("gzip;q=0.5, br", ["br", "gzip"]), "br")
+        self.assertEqual(choose_encoding("br;q=0.5, gzip;q=0.5", ["br", "gzip"]), "br")
+        self.assertEqual(choose_encoding("*;q=0.1, gzip;q=0", ["gzip"]), None)
+        self.assertEqual(choose_encoding("", ["gzip"]), None)
+
+    def test_large_json_is_gzipped(self):
+        plain = self.client.get(self.url)
+        compressed = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertNotIn("Content-Encoding", plain)
+        self.assertEqual(compressed["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", compressed["Vary"])
+        self.assertEqual(gzip.decompress(compressed.content), plain.content)
+        self.assertLess(len(compressed.content), len(plain.content) / 3)
+
+    def test_small_responses_are_not_compressed(self):
+        book = Book.objects.first()
+        response = self.client.get(reverse("book-detail", args=[book.id]), HTTP_ACCEPT_ENCODING="gzip")
+        self.assertNotIn("Content-Encoding", response)
+
+    def test_etag_is_weakened_and_still_matches(self):
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertTrue(response["ETag"].startswith('W/"'))
+
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_cached_response_is_compressed_once(self):
+        encode = mock.Mock(side_effect=ENCODERS["gzip"])
+        with mock.patch.dict(ENCODERS, {"gzip": encode}):
+            first = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip")
+            second = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip")
+            self.assertEqual(second["X-Cache"], "HIT")
+            self.assertEqual(second.content, first.content)
+            self.assertEqual(encode.call_count, 1)
+
+            # A write bumps the version: new response, compressed again
+            Book.objects.create(title="Foundation 30", publication_year=1951, author=Author.objects.get())
+            bump_version(Book)
+            self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip")
+            self.assertEqual(encode.call_count, 2)
+
+    def test_export_stream_is_gzipped(self):
+        response = self.client.get(reverse("book-export"), HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        lines = gzip.decompress(b"".join(response.streaming_content)).splitlines()
+        self.assertEqual(len(lines), 30)
+
+
+@skipIf(msgpack is None, "msgpack is not installed")
+class MessagePackTestCase(APITestCase):
+    """
+    Test suite for the MessagePack renderer and parser.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="testuser", password="password123")
+        self.author = Author.objects.create(name="Isaac Asimov")
+        self.book = Book.objects.create(title="Foundation", publication_year=1951, author=self.author)
+
+    def test_list_and_detail_match_json(self):
+        for url in [reverse("book-list"), reverse("book-detail", args=[self.book.id])]:
+            as_json = self.client.get(url, HTTP_ACCEPT="application/json")
+            as_msgpack = self.client.get(url, HTTP_ACCEPT="application/msgpack")
+
+            self.assertEqual(as_msgpack["Content-Type"], "application/msgpack")
+            self.assertEqual(msgpack.unpackb(as_msgpack.content), json.loads(as_json.content))
+            self.assertNotEqual(as_msgpack["ETag"], as_json["ETag"])
+
+        response = self.client.get(reverse("book-detail", args=[self.book.id]) + "?format=msgpack")
+        self.assertEqual(msgpack.unpackb(response.content)["title"], "Foundation")
+
+    def test_create_and_bulk_create_from_msgpack(self):
+        self.client.login(username="testuser", password="password123")
+        book = {"title": "I, Robot", "publication_year": 1950, "author": self.author.id}
+
+        response = self.client.post(
+            reverse("book-create"), msgpack.packb(book), content_type="application/msgpack",
+            HTTP_ACCEPT="application/msgpack"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(msgpack.unpackb(response.content)["title"], "I, Robot")
+
+        response = self.client.post(
+            reverse("book-create"), msgpack.packb([dict(book, title="The Caves of Steel")] * 2),
+            content_type="application/msgpack"
+        )
+        self.assertEqual(response.data["created"], 2)
+
+    def test_invalid_msgpack_is_rejected(self):
+        self.client.login(username="testuser", password="password123")
+        response = self.client.post(reverse("book-create"), b"\xc1", content_type="application/msgpack")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
@@ -1,16 +1,38 @@
 from django.urls import path
+from . import async_views
 from .views import (
     BookListView,
     BookDetailView,
+    BookBatchView,
     BookCreateView,
     BookUpdateView,
-    BookDeleteView
+    BookDeleteView,
+    BookExportView,
+    BookAutocompleteView,
+    BookBulkUpdateView,
+    BookBulkDeleteView,
+    AuthorListView,
+    AuthorDetailView,
+    CacheStatsView
 )
 
 urlpatterns = [
     path('books/', BookListView.as_view(), name='book-list'),
     path('books/<int:pk>/', BookDetailView.as_view(), name='book-detail'),
+    path('books/batch/', BookBatchView.as_view(), name='book-batch'),
+    path('books/export/', BookExportView.as_view(), name='book-export'),
+    path('books/autocomplete/', BookAutocompleteView.as_view(), name='book-autocomplete'),
     path('books/create/', BookCreateView.as_view(), name='book-create'),
-    path('books/update/', BookUpdateView.as_view(), name='book-update'),
-    path('books/delete/', BookDeleteView.as_view(), name='book-delete'),
+    path('books/<int:pk>/update/', BookUpdateView.as_view(), name='book-update'),
+    path('books/<int:pk>/delete/', BookDeleteView.as_view(), name='book-delete'),
+    # Bulk operations, scoped by the same filters as book-list
+    path('books/update/', BookBulkUpdateView.as_view(), name='book-bulk-update'),
+    path('books/delete/', BookBulkDeleteView.as_view(), name='book-bulk-delete'),
+    path('authors/', AuthorListView.as_view(), name='author-list'),
+    path('authors/<int:pk>/', AuthorDetailView.as_view(), name='author-detail'),
+    # Native async variants (see api/async_views.py)
+    path('async/books/', async_views.book_list, name='async-book-list'),
+    path('async/books/<int:pk>/', async_views.book_detail, name='async-book-detail'),
+    path('async/books/create/', async_views.book_create, name='async-book-create'),
+    path('cache/stats/', CacheStatsView.as_view(), name='cache-stats'),
 ]
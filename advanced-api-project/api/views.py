@@ -1,10 +1,40 @@
+import logging
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.db.models import Count, F, Prefetch, Window
+from django.db.models.functions import RowNumber
 from django.shortcuts import render
+from django.utils import timezone
 #from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import generics, filters
+from rest_framework import generics, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from django_filters import rest_framework
-from models import Book
-from serializers import BookSerializer
-from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
+from django_filters.constants import EMPTY_VALUES
+from django_filters.utils import translate_validation
+from . import autocomplete, search
+from .batch import BatchRetrieveMixin
+from .cache import CachedResponseMixin, bump_version, get_stats
+from .export import EXPORT_FORMATS, export_lines
+from .facets import FacetsMixin
+from .fast import FastListMixin, FastRepresentation
+from .conditional import RowConditionalMixin, TableConditionalMixin
+from .models import Author, Book
+from .pagination import AuthorCursorPagination, BookCursorPagination
+from .sparse import SparseFieldsMixin
+from .search import FTS5SearchFilter, RelevanceOrderingFilter
+from .serializers import AuthorSerializer, BookSerializer
+from rest_framework.permissions import AllowAny, IsAuthenticatedOrReadOnly, IsAuthenticated
+
+logger = logging.getLogger('api.books')
+
+# Rows handled per query by the bulk update / delete views
+BULK_CHUNK_SIZE = 1000
 
 
 # ---------------------------------------------------------
@@ -16,23 +46,48 @@ from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticate
 # - Ordering: ?ordering=title  OR  ?ordering=-publication_year
 #
 # Filtering uses DjangoFilterBackend.
-# Searching uses SearchFilter.
-# Ordering uses OrderingFilter.
-class BookListView(generics.ListAPIView):
+# Searching uses FTS5SearchFilter (full-text index, see api/search.py).
+# Ordering uses RelevanceOrderingFilter: search results are ranked by
+# relevance unless ?ordering= is given.
+#
+# Results are paginated with a keyset cursor that follows the
+# active ordering (see api/pagination.py):
+# - Paging: ?cursor=<opaque token>&page_size=50
+#
+# Responses are cached per query string until the next write
+# (see api/cache.py), and carry ETag / Last-Modified headers so
+# clients can revalidate with a 304 (see api/conditional.py).
+#
+# Pages are built by the fast read path (see api/fast.py): rows are
+# fetched with .values() and turned into BookSerializer-identical
+# dicts without model instances.
+#
+# Sparse fieldsets: ?fields=id,title or ?exclude=updated_at
+# (see api/sparse.py).
+#
+# Facet counts: ?facets=publication_year,author (see api/facets.py).
+#
+# Batch retrieval: ?ids=3,1,2 returns exactly those books, in that
+# order, with one query; filters, search and paging don't apply
+# (see api/batch.py).
+class BookListView(TableConditionalMixin, CachedResponseMixin, SparseFieldsMixin, FacetsMixin, BatchRetrieveMixin,
+                   FastListMixin, generics.ListAPIView):
     queryset = Book.objects.all()
     serializer_class = BookSerializer
     permission_classes = [IsAuthenticatedOrReadOnly] # Read-only access for all
+    throttle_scope = 'book-list'
     # Add advanced query features:
     filter_backends = [
         rest_framework.DjangoFilterBackend,
-        filters.SearchFilter,
-        filters.OrderingFilter
+        FTS5SearchFilter,
+        RelevanceOrderingFilter
     ]
 
     # Enable filtering by these model fields
     filterset_fields = ['title', 'publication_year', 'author']
 
     # Enable text search on these fields
+    # (indexed by FTS5; used directly as icontains fallback off SQLite)
     search_fields = ['title', 'author__name']
 
     # Allow ordering of results
@@ -41,16 +96,46 @@ class BookListView(generics.ListAPIView):
     # Provide a default ordering
     ordering = ['title']
 
+    # Keyset pagination keyed on the active ordering (+ id)
+    pagination_class = BookCursorPagination
+
+    # Facets: name -> (field, label field)
+    facet_fields = {
+        'publication_year': ('publication_year', None),
+        'author': ('author', 'author__name'),
+    }
+
 # ---------------------------------------------------------
 # BookDetailView
 # ---------------------------------------------------------
 # Provides: GET /books/<pk>/
 # - Retrieves a single book by ID.
 # - Read-only for all.
-class BookDetailView(generics.RetrieveAPIView):
+# - Cached until the next write (see api/cache.py).
+# - ETag / Last-Modified from the book's updated_at.
+# - Sparse fieldsets: ?fields= / ?exclude=, as on the list.
+class BookDetailView(RowConditionalMixin, CachedResponseMixin, SparseFieldsMixin, generics.RetrieveAPIView):
     queryset = Book.objects.all()
     serializer_class = BookSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]  # Read-only access for all
+    throttle_scope = 'book-detail'
+
+# ---------------------------------------------------------
+# BookBatchView
+# ---------------------------------------------------------
+# Provides: POST /books/batch/  {"ids": [3, 1, 2]}
+# - Same as GET /books/?ids=3,1,2, for id lists too long for a URL.
+# - A read: open to everyone, not cached.
+class BookBatchView(SparseFieldsMixin, BatchRetrieveMixin, generics.GenericAPIView):
+    queryset = Book.objects.all()
+    serializer_class = BookSerializer
+    permission_classes = [AllowAny]
+    throttle_scope = 'book-list'
+
+    def post(self, request, *args, **kwargs):
+        data = request.data
+        ids = data.get(self.batch_param) if hasattr(data, 'get') else data  # {"ids": [...]} or [...]
+        return self.batch_response(self.get_batch_ids(ids))
 
 # ---------------------------------------------------------
 # BookCreateView
@@ -60,16 +145,75 @@ class BookDetailView(generics.RetrieveAPIView):
 # - Requires authentication.
 # - Custom behavior: validate data on creation, and you can
 #   add custom logic (logging, notifications, etc.)
+#
+# Bulk mode: POST a JSON array of books instead of one object.
+# - All items are validated, then inserted with bulk_create in
+#   batches of ?batch_size= rows (default API_BULK_BATCH_SIZE)
+#   inside one transaction.
+# - Any invalid item rejects the whole request (400, errors per
+#   item), unless ?partial=true: valid items are then created and
+#   the invalid ones are reported under "errors".
 class BookCreateView(generics.CreateAPIView):
     queryset = Book.objects.all()
     serializer_class = BookSerializer
     permission_classes = [IsAuthenticated]
+    throttle_scope = 'book-write'
 
-    # Custom behavior: Example log before save
-    def perform_create(self, serializer):
-        # Example: print log or hook custom logic
-        print(f"Creating new book: {serializer.validated_data}")
+    def create(self, request, *args, **kwargs):
+        if isinstance(request.data, list):
+            return self.bulk_create(request)
+        return super().create(request, *args, **kwargs)
+
+    def bulk_create(self, request):
+        items = request.data
+        max_items = getattr(settings, 'API_BULK_MAX_ITEMS', 10000)
+        if len(items) > max_items:
+            return Response(
+                {'detail': f'At most {max_items} books can be created per request.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        context = self.get_serializer_context()
+        context['batch_size'] = self._get_batch_size(request)
+        context['skip_invalid'] = request.query_params.get('partial', '').lower() in ('1', 'true', 'yes')
+        # Resolve every referenced author with one query. Other values
+        # (lists, objects...) are left to the serializer to reject.
+        authors = [item.get('author') for item in items if isinstance(item, dict)]
+        context['authors'] = Author.objects.in_bulk({
+            pk for pk in authors
+            if type(pk) is int or (isinstance(pk, str) and pk.isdigit())
+        })
+
+        serializer = self.serializer_class(data=items, many=True, context=context)
+        serializer.is_valid(raise_exception=True)
         serializer.save()
+        bump_version(Book)
+
+        errors = serializer.item_errors or {}
+        return Response({
+            'created': len(serializer.instance),
+            'results': serializer.data,
+            'errors': [{'index': index, 'errors': detail} for index, detail in sorted(errors.items())],
+        }, status=status.HTTP_201_CREATED)
+
+    def _get_batch_size(self, request):
+        default = getattr(settings, 'API_BULK_BATCH_SIZE', 500)
+        try:
+            batch_size = int(request.query_params.get('batch_size', default))
+        except ValueError:
+            return default
+        return max(1, min(batch_size, default * 10))
+
+    # Custom behavior: log a `book.created` event (see api/log.py)
+    def perform_create(self, serializer):
+        started = time.perf_counter()
+        book = serializer.save()
+        save_ms = (time.perf_counter() - started) * 1000
+        logger.info('book.created', extra={'event': {
+            'book_id': book.pk,
+            'fields': sorted(serializer.validated_data),
+            'save_ms': round(save_ms, 3),
+        }})
 
 # ---------------------------------------------------------
 # BookUpdateView
@@ -82,10 +226,26 @@ class BookUpdateView(generics.RetrieveUpdateAPIView):
     queryset = Book.objects.all()
     serializer_class = BookSerializer
     permission_classes = [IsAuthenticated]
+    throttle_scope = 'book-write'
 
     def perform_update(self, serializer):
-        print(f"Updating book ID={self.kwargs['pk']}")
-        serializer.save()
+        # Compare column values (author_id, not author) so no query is needed
+        fields = [Book._meta.get_field(name) for name in serializer.validated_data]
+        before = [field.value_from_object(serializer.instance) for field in fields]
+
+        started = time.perf_counter()
+        book = serializer.save()
+        save_ms = (time.perf_counter() - started) * 1000
+
+        changed = [
+            field.name for field, old in zip(fields, before)
+            if field.value_from_object(book) != old
+        ]
+        logger.info('book.updated', extra={'event': {
+            'book_id': book.pk,
+            'fields': sorted(changed),
+            'save_ms': round(save_ms, 3),
+        }})
 
 # ---------------------------------------------------------
 # BookDeleteView
@@ -97,7 +257,249 @@ class BookDeleteView(generics.DestroyAPIView):
     queryset = Book.objects.all()
     serializer_class = BookSerializer
     permission_classes = [IsAuthenticated]
+    throttle_scope = 'book-write'
+
+    def perform_destroy(self, instance):
+        instance.delete()
+
+
+# ---------------------------------------------------------
+# BookExportView
+# ---------------------------------------------------------
+# Provides: GET /books/export/?output=ndjson|csv
+# - Streams every matching book, one line per book (default: ndjson).
+# - Takes the same filter / search / ordering params as BookListView;
+#   ordered by id unless ?ordering= is given.
+# - Rows come from .values(...).iterator(chunk_size=...) through the
+#   fast read path, so memory stays flat whatever the catalog size.
+# - Each row is a BookSerializer row plus `author_name`.
+class BookExportView(generics.GenericAPIView):
+    queryset = Book.objects.all()
+    serializer_class = BookSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    throttle_scope = 'book-export'
+    filter_backends = BookListView.filter_backends
+    filterset_fields = BookListView.filterset_fields
+    search_fields = BookListView.search_fields
+    ordering_fields = BookListView.ordering_fields
+    ordering = ['id']
 
+    def get(self, request, *args, **kwargs):
+        export_format = request.query_params.get('output', 'ndjson')
+        if export_format not in EXPORT_FORMATS:
+            raise ValidationError({'output': f"Choose one of: {', '.join(EXPORT_FORMATS)}."})
+        content_type, extension = EXPORT_FORMATS[export_format]
 
+        fast = FastRepresentation.for_serializer(self.get_serializer_class())
+        queryset = self.filter_queryset(self.get_queryset())
+        chunk_size = getattr(settings, 'API_EXPORT_CHUNK_SIZE', 2000)
+        to_representation = fast.get_function()
+
+        def rows():
+            for row in queryset.values(*fast.columns, 'author__name').iterator(chunk_size=chunk_size):
+                item = to_representation(row)
+                item['author_name'] = row['author__name']
+                yield item
+
+        columns = [*fast.fields, 'author_name']
+        response = StreamingHttpResponse(
+            export_lines(export_format, rows(), columns),
+            content_type=content_type
+        )
+        response['Content-Disposition'] = f'attachment; filename="books.{extension}"'
+        return response
+
+
+# ---------------------------------------------------------
+# Bulk update / delete
+# ---------------------------------------------------------
+# Both bulk views select books with the same filters as
+# BookListView (?title=, ?publication_year=, ?author=). At least
+# one filter is required so a bare request cannot hit the whole
+# table by accident.
+# - ?dry_run=true only reports how many books would be affected.
+# - Require authentication.
+def _flag(request, name):
+    return request.query_params.get(name, '').lower() in ('1', 'true', 'yes')
+
+
+class BookBulkMixin:
+    queryset = Book.objects.all()
+    serializer_class = BookSerializer
+    permission_classes = [IsAuthenticated]
+    throttle_scope = 'book-write'
+    filter_backends = [rest_framework.DjangoFilterBackend]
+    filterset_fields = BookListView.filterset_fields
 
+    def get_bulk_queryset(self, request):
+        filterset = rest_framework.DjangoFilterBackend().get_filterset(request, self.get_queryset(), self)
+        if not filterset.is_valid():
+            raise translate_validation(filterset.errors)
+        # django-filter skips empty values (?title=), so a parameter
+        # only counts when the filterset actually applies it
+        if all(value in EMPTY_VALUES for value in filterset.form.cleaned_data.values()):
+            raise ValidationError({'detail': 'At least one filter is required: ' + ', '.join(self.filterset_fields)})
+        return filterset.qs
+
+
+# ---------------------------------------------------------
+# BookBulkUpdateView
+# ---------------------------------------------------------
+# Provides: PATCH /books/update/?<filters>
+# - Applies the body ({"publication_year": 1952}) to every
+#   matching book with a single UPDATE query.
+# - The body is validated like a partial BookSerializer update.
+class BookBulkUpdateView(BookBulkMixin, generics.GenericAPIView):
+
+    def patch(self, request, *args, **kwargs):
+        queryset = self.get_bulk_queryset(request)
+
+        serializer = self.get_serializer(data=request.data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        changes = serializer.validated_data
+        if not changes:
+            raise ValidationError({'detail': 'Nothing to update.'})
+
+        if _flag(request, 'dry_run'):
+            return Response({'matched': queryset.count(), 'updated': 0, 'dry_run': True})
+
+        reindex = 'title' in changes or 'author' in changes
+        with transaction.atomic():
+            # Remember the rows first: the filter may no longer match them afterwards
+            ids = list(queryset.values_list('pk', flat=True)) if reindex else None
+            updated = queryset.update(**changes, updated_at=timezone.now())
+            if reindex:
+                # QuerySet.update() sends no signals: refresh the search indexes
+                for start in range(0, len(ids), BULK_CHUNK_SIZE):
+                    rows = list(Book.objects.filter(pk__in=ids[start:start + BULK_CHUNK_SIZE]).values_list(
+                        'id', 'title', 'author__name'
+                    ))
+                    search.index_books(rows)
+                    titles = [(pk, title) for pk, title, _ in rows]
+                    transaction.on_commit(lambda titles=titles: autocomplete.index.put(titles))
+        bump_version(Book)
+
+        return Response({'matched': updated, 'updated': updated, 'dry_run': False})
+
+
+# ---------------------------------------------------------
+# BookBulkDeleteView
+# ---------------------------------------------------------
+# Provides: DELETE /books/delete/?<filters>
+# - Deletes every matching book, BULK_CHUNK_SIZE books per
+#   transaction, so large deletes never hold one huge lock.
+class BookBulkDeleteView(BookBulkMixin, generics.GenericAPIView):
+
+    def delete(self, request, *args, **kwargs):
+        queryset = self.get_bulk_queryset(request)
+
+        if _flag(request, 'dry_run'):
+            return Response({'matched': queryset.count(), 'deleted': 0, 'dry_run': True})
+
+        deleted = 0
+        while True:
+            with transaction.atomic():
+                ids = list(queryset.values_list('pk', flat=True)[:BULK_CHUNK_SIZE])
+                if not ids:
+                    break
+                # Sends post_delete per book: the receivers bump the version
+                deleted += Book.objects.filter(pk__in=ids).delete()[0]
+
+        return Response({'matched': deleted, 'deleted': deleted, 'dry_run': False})
+
+
+# ---------------------------------------------------------
+# Author views
+# ---------------------------------------------------------
+# Authors are served with their books nested (AuthorSerializer).
+# The books for a whole page of authors are loaded with ONE
+# prefetch query, and capped to the newest N per author with a
+# ROW_NUMBER() window, so prolific authors can't blow up the
+# response. `book_count` always reports the full number.
+# - Cap: ?books=5 (default and maximum: API_AUTHOR_BOOKS_LIMIT)
+class AuthorQuerysetMixin:
+    serializer_class = AuthorSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+    def get_books_limit(self):
+        limit = getattr(settings, 'API_AUTHOR_BOOKS_LIMIT', 10)
+        try:
+            requested = int(self.request.query_params.get('books', limit))
+        except ValueError:
+            return limit
+        return max(0, min(requested, limit))
+
+    def get_queryset(self):
+        top_books = Book.objects.annotate(
+            row_number=Window(
+                RowNumber(),
+                partition_by=F('author_id'),
+                order_by=[F('publication_year').desc(), F('id').desc()],
+            )
+        ).filter(row_number__lte=self.get_books_limit()).order_by('-publication_year', '-id')
+
+        return Author.objects.annotate(
+            book_count=Count('books')
+        ).prefetch_related(
+            Prefetch('books', queryset=top_books)
+        )
+
+
+# ---------------------------------------------------------
+# AuthorListView
+# ---------------------------------------------------------
+# Provides: GET /authors/
+# - Lists authors by name, keyset-paginated.
+# - Read-only for all.
+class AuthorListView(AuthorQuerysetMixin, generics.ListAPIView):
+    pagination_class = AuthorCursorPagination
+    throttle_scope = 'author-list'
+
+
+# ---------------------------------------------------------
+# AuthorDetailView
+# ---------------------------------------------------------
+# Provides: GET /authors/<pk>/
+# - Retrieves a single author with their newest books.
+# - Read-only for all.
+class AuthorDetailView(AuthorQuerysetMixin, generics.RetrieveAPIView):
+    throttle_scope = 'author-detail'
+
+
+# ---------------------------------------------------------
+# BookAutocompleteView
+# ---------------------------------------------------------
+# Provides: GET /books/autocomplete/?q=<prefix>&limit=<n>
+# - Books whose title starts with `q` (case and accents ignored),
+#   in title order, answered from the in-memory index in
+#   api/autocomplete.py without a database query.
+# - limit: default 10, at most AUTOCOMPLETE_MAX_LIMIT.
+AUTOCOMPLETE_MAX_LIMIT = 50
+
+
+class BookAutocompleteView(APIView):
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    throttle_scope = 'book-autocomplete'
+
+    def get(self, request):
+        try:
+            limit = int(request.query_params.get('limit', 10))
+        except ValueError:
+            raise ValidationError({'limit': 'Must be an integer.'})
+        limit = max(1, min(limit, AUTOCOMPLETE_MAX_LIMIT))
+
+        matches = autocomplete.index.search(request.query_params.get('q', ''), limit)
+        return Response({'results': [{'id': pk, 'title': title} for pk, title in matches]})
+
+
+# ---------------------------------------------------------
+# CacheStatsView
+# ---------------------------------------------------------
+# Provides: GET /cache/stats/
+# - Response cache hit/miss counts per read view.
+# - Staff only.
+class CacheStatsView(APIView):
+    permission_classes = [IsAdminUser]
 
+    def get(self, request):
+        return Response(get_stats([BookListView.__name__, BookDetailView.__name__]))
@@ -0,0 +1,197 @@
+import random
+import time
+from itertools import accumulate, islice, repeat
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+
+from relationship_app.models import Author, Book, Librarian, Library
+
+FIRST_NAMES = (
+    'Ada Alan Alice Ann Arthur Beatrix Carl Clara David Edith Emil Ella Frank Grace '
+    'Hans Helen Ivan Iris James Jane Karl Lena Leo Lucy Mark Mary Nina Omar Paul Rosa'
+).split()
+LAST_NAMES = (
+    'Adams Baker Brown Clarke Davies Evans Fischer Garcia Hughes Ivanova Jones King '
+    'Lopez Martin Meyer Nakamura Novak Okafor Patel Rossi Silva Smith Taylor Weber'
+).split()
+TITLE_WORDS = (
+    'empire foundation robot dune night city star river silent winter shadow garden '
+    'machine ocean glass fire stone last first lost hidden iron light house road song'
+).split()
+LIBRARY_KINDS = 'Public City County University School Community Central Memorial'.split()
+TITLE_POOL_SIZE = 20_000
+
+
+def zipf_cum_weights(n, exponent):
+    """Cumulative weights of ranks 1..n with P(rank k) ~ 1 / k**exponent."""
+    return list(accumulate(1 / rank ** exponent for rank in range(1, n + 1)))
+
+
+class Command(BaseCommand):
+    help = (
+        'Generates synthetic authors, books, libraries and librarians with '
+        'skewed distributions: books per author and library sizes follow a '
+        'Zipf-like law, and libraries mostly hold the same popular books. '
+        'Rows are added to the existing data in batches, one transaction '
+        'per batch.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--authors', type=int, default=100_000, help='Authors to create (default: 100000).')
+        parser.add_argument('--books', type=int, default=1_000_000, help='Books to create (default: 1000000).')
+        parser.add_argument(
+            '--libraries', type=int, default=1_000,
+            help='Libraries to create, one librarian each (default: 1000).'
+        )
+        parser.add_argument(
+            '--library-books', type=int, default=500,
+            help='Average number of books per library (default: 500).'
+        )
+        parser.add_argument(
+            '--skew', type=float, default=1.1,
+            help='Zipf exponent; higher means more skewed (default: 1.1).'
+        )
+        parser.add_argument('--batch-size', type=int, default=50_000, help='Rows per transaction (default: 50000).')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0).')
+
+    def handle(self, *args, **options):
+        if options['authors'] < 1 and options['books'] > 0:
+            raise CommandError('Books need at least one author.')
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+
+        if connection.vendor == 'sqlite':
+            # A larger page cache keeps the indexes in memory while they
+            # are filled in random order (default: 2 MB).
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA cache_size = -262144')  # 256 MB, this connection only
+
+        started = time.monotonic()
+        # Like loaddata: every foreign key below points at a row created
+        # earlier in this run, so checking each one on insert is wasted work.
+        with connection.constraint_checks_disabled():
+            rows = self._generate(options)
+        self._reset_sequences()
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {rows:,} rows in {elapsed:.1f}s, {rows / elapsed if elapsed else 0:,.0f} rows/sec.'
+        ))
+
+    def _generate(self, options):
+        skew = options['skew']
+        rows = 0
+
+        # Values are drawn in bulk from small pools; building strings per
+        # row would cost more than the inserts.
+        person_names = [f'{first} {last}' for first in FIRST_NAMES for last in LAST_NAMES]
+        titles = [self._title() for _ in range(TITLE_POOL_SIZE)]
+
+        # Primary keys are assigned here so nothing has to be read back,
+        # and books/memberships can refer to them directly.
+        author_ids = self._next_ids(Author, options['authors'])
+        rows += self._insert(Author, ['id', 'name'], zip(
+            author_ids, self.rng.choices(person_names, k=len(author_ids))
+        ), len(author_ids))
+
+        # Books per author: the author of each book is drawn by popularity
+        # rank, so a few authors write most books and many write one or none.
+        book_ids = self._next_ids(Book, options['books'])
+        if book_ids:
+            popular_authors = self._ranked(author_ids)
+            authors = self.rng.choices(
+                popular_authors, cum_weights=zipf_cum_weights(len(author_ids), skew), k=len(book_ids)
+            )
+            rows += self._insert(Book, ['id', 'title', 'author'], zip(
+                book_ids, self.rng.choices(titles, k=len(book_ids)), authors
+            ), len(book_ids))
+
+        library_ids = self._next_ids(Library, options['libraries'])
+        rows += self._insert(Library, ['id', 'name'], (
+            (pk, f'{self.rng.choice(LAST_NAMES)} {self.rng.choice(LIBRARY_KINDS)} Library {pk}')
+            for pk in library_ids
+        ), len(library_ids))
+        rows += self._insert(Librarian, ['name', 'library'], zip(
+            self.rng.choices(person_names, k=len(library_ids)), library_ids
+        ), len(library_ids))
+
+        if book_ids and library_ids:
+            sizes = self._library_sizes(len(library_ids), options['library_books'], len(book_ids), skew)
+            rows += self._insert(
+                Library.books.through, ['library', 'book'],
+                self._memberships(library_ids, sizes, book_ids, skew), sum(sizes)
+            )
+        return rows
+
+    def _reset_sequences(self):
+        # The ids were assigned explicitly, so backends with sequences
+        # (PostgreSQL, Oracle) would hand out taken ids to the next ORM
+        # insert. Same statements as loaddata; none on SQLite and MySQL.
+        models = [Author, Book, Library, Librarian, Library.books.through]
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        if statements:
+            with transaction.atomic(), connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+
+    def _next_ids(self, model, count):
+        start = (model.objects.aggregate(Max('id'))['id__max'] or 0) + 1
+        return range(start, start + max(0, count))
+
+    def _ranked(self, ids):
+        # Popularity rank -> id, so the popular rows are spread over the table
+        ranked = list(ids)
+        self.rng.shuffle(ranked)
+        return ranked
+
+    def _title(self):
+        return ' '.join(self.rng.choice(TITLE_WORDS) for _ in range(self.rng.randint(1, 4))).title()
+
+    def _library_sizes(self, libraries, average, books, skew):
+        # Zipf-like too: a few large central libraries, a long tail of small ones
+        weights = [1 / rank ** skew for rank in range(1, libraries + 1)]
+        scale = libraries * average / sum(weights)
+        sizes = [min(books, max(1, round(weight * scale))) for weight in weights]
+        self.rng.shuffle(sizes)
+        return sizes
+
+    def _memberships(self, library_ids, sizes, book_ids, skew):
+        # Every library draws from the same book popularity ranking, so
+        # popular books are held by many libraries. Duplicate draws are
+        # replaced by uniformly picked books to keep the exact size.
+        popular_books = self._ranked(book_ids)
+        cum_weights = zipf_cum_weights(len(popular_books), skew)
+        for library_id, size in zip(library_ids, sizes):
+            chosen = set(self.rng.choices(popular_books, cum_weights=cum_weights, k=size))
+            while len(chosen) < size:
+                chosen.update(self.rng.choices(book_ids, k=size - len(chosen)))
+            # In index order, which SQLite inserts fastest
+            yield from zip(repeat(library_id), sorted(chosen))
+
+    def _insert(self, model, fields, rows, total):
+        # executemany() on plain tuples: bulk_create() builds a model
+        # instance per row and, on SQLite, is limited to 999 parameters
+        # per statement, which caps it at about 20k rows/sec.
+        if not total:
+            return 0
+        quote = connection.ops.quote_name
+        columns = [model._meta.get_field(name).column for name in fields]
+        sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            quote(model._meta.db_table), ', '.join(map(quote, columns)), ', '.join(['%s'] * len(columns))
+        )
+
+        started = time.monotonic()
+        done = 0
+        rows = iter(rows)
+        while batch := list(islice(rows, self.batch_size)):
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.executemany(sql, batch)
+            done += len(batch)
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f'{model._meta.db_table}: {done:,} rows, '
+            f'{done / elapsed if elapsed else 0:,.0f} rows/sec'
+        )
+        return done
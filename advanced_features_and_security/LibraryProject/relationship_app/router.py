@@ -0,0 +1,140 @@
+import hashlib
+import math
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.deprecation import MiddlewareMixin
+
+PRIMARY = DEFAULT_DB_ALIAS
+PIN_COOKIE = 'db_pin'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+
+class PinState:
+    # Reads go to the primary until `pinned_until` (unix time), and
+    # inside use_primary() blocks
+    def __init__(self, pinned_until=0.0):
+        self.pinned_until = pinned_until
+        self.forced = 0
+        self.wrote = False
+
+
+# One state per request (set by ReplicaPinningMiddleware), or per
+# thread / task outside requests (management commands, shell).
+_state = ContextVar('db_pin_state', default=None)
+
+
+def pin_seconds():
+    return getattr(settings, 'DATABASE_PIN_SECONDS', 5)
+
+
+def _get_state():
+    state = _state.get()
+    if state is None:
+        state = PinState()
+        _state.set(state)
+    return state
+
+
+def is_pinned():
+    state = _state.get()
+    if state is not None and (state.forced or state.pinned_until > time.time()):
+        return True
+    # Reads inside a transaction on the primary must see its writes
+    return connections[PRIMARY].in_atomic_block
+
+
+@contextmanager
+def use_primary():
+    """Send every read in the block to the primary."""
+    state = _get_state()
+    state.forced += 1
+    try:
+        yield
+    finally:
+        state.forced -= 1
+
+
+# ------------------------------------------------
+# ReplicaRouter
+# ------------------------------------------------
+# Writes go to the primary (`default`), reads to one of the aliases in
+# DATABASE_REPLICAS, picked at random. Without replicas everything
+# stays on the primary.
+#
+# Read-your-writes: after a write, reads from the same request, thread
+# or client go to the primary for DATABASE_PIN_SECONDS, long enough
+# for the replicas to catch up. So do reads inside a transaction on
+# the primary, and every read of a POST / PUT / PATCH / DELETE request.
+#
+# Replicas are read-only copies: migrations only run on the primary.
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        replicas = getattr(settings, 'DATABASE_REPLICAS', [])
+        if not replicas or is_pinned():
+            return PRIMARY
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = _get_state()
+        state.wrote = True
+        state.pinned_until = max(state.pinned_until, time.time() + pin_seconds())
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {PRIMARY, *getattr(settings, 'DATABASE_REPLICAS', [])}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY
+
+
+# ------------------------------------------------
+# ReplicaPinningMiddleware
+# ------------------------------------------------
+# Carries the read-your-writes window from one request to the next.
+# After a request that wrote, the client is pinned to the primary for
+# DATABASE_PIN_SECONDS:
+# - by a short-lived `db_pin` cookie (browsers, sessions, logins)
+# - by a cache entry keyed on the Authorization header, for token
+#   clients that don't keep cookies (shared across processes only
+#   with a shared cache backend)
+#
+# Put it before any middleware that reads the database.
+class ReplicaPinningMiddleware(MiddlewareMixin):
+
+    def process_request(self, request):
+        if request.method not in SAFE_METHODS:
+            pinned_until = math.inf
+        elif request.COOKIES.get(PIN_COOKIE):
+            pinned_until = time.time() + pin_seconds()
+        else:
+            key = self.client_key(request)
+            pinned_until = (key and cache.get(key)) or 0.0
+        _state.set(PinState(pinned_until))
+
+    def process_response(self, request, response):
+        state = _state.get()
+        if state is not None and state.wrote:
+            seconds = pin_seconds()
+            response.set_cookie(PIN_COOKIE, '1', max_age=seconds, httponly=True, samesite='Lax')
+            key = self.client_key(request)
+            if key:
+                cache.set(key, time.time() + seconds, seconds)
+        _state.set(None)
+        return response
+
+    @staticmethod
+    def client_key(request):
+        authorization = request.META.get('HTTP_AUTHORIZATION')
+        if not authorization:
+            return None
+        return 'db_pin:' + hashlib.sha256(authorization.encode('utf-8')).hexdigest()
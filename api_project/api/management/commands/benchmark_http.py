@@ -0,0 +1,228 @@
+import asyncio
+import functools
+import json
+import platform
+import random
+import time
+from datetime import datetime, timezone
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+
+from api.loadgen import LocalServer, git_commit, run_mix
+from api.models import Book
+
+DATASETS = {'1k': 1_000, '100k': 100_000, '1m': 1_000_000}
+WORDS = (
+    'empire foundation robot dune night city star river silent winter shadow '
+    'garden machine ocean glass fire stone last first lost hidden iron light'
+).split()
+BENCH_USER = 'benchmark'
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'HTTP load test of /api/books/ and the /api/books_all/ router. '
+        'Loads a fixed-seed dataset (--dataset), starts the dev server (or '
+        'uses --base-url), runs the read and mixed workloads and reports '
+        'p50/p95/p99 latency, requests/sec and queries per request, '
+        'optionally as JSON (--output) to compare runs across commits.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dataset', choices=sorted(DATASETS),
+            help='Replace ALL books with the fixed-seed dataset of this size first.'
+        )
+        parser.add_argument(
+            '--noinput', '--no-input', action='store_false', dest='interactive',
+            help='Do not ask before replacing the data.'
+        )
+        parser.add_argument(
+            '--workload', choices=['read', 'mixed'], nargs='+', default=['read', 'mixed'],
+            help='Workloads to run (default: read mixed).'
+        )
+        parser.add_argument('--clients', type=int, default=50, help='Concurrent clients (default: 50).')
+        parser.add_argument(
+            '--requests', type=int, default=40,
+            help='Requests per client and workload (default: 40).'
+        )
+        parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0).')
+        parser.add_argument(
+            '--base-url',
+            help='Benchmark this running server instead of starting `runserver`. '
+                 'It must use the same database.'
+        )
+        parser.add_argument('--output', help='Write the results to this JSON file.')
+
+    def handle(self, *args, **options):
+        if options['dataset']:
+            size = DATASETS[options['dataset']]
+            if options['interactive'] and input(
+                f'This deletes every book and loads {size:,} books. Type "yes" to continue: '
+            ) != 'yes':
+                raise CommandError('Cancelled.')
+            self._load_dataset(size, options['seed'])
+
+        book_ids = list(Book.objects.order_by('id').values_list('id', flat=True))
+        if not book_ids:
+            raise CommandError('No books to benchmark; use --dataset.')
+        headers = self._auth_headers()
+        # Reads and updates use the first half of the table; in the mixed
+        # workload each client deletes its own share of the second half
+        kept = book_ids[:len(book_ids) // 2] or book_ids
+        spare = book_ids[len(kept):]
+        workloads = {name: functools.partial(self._operations, name, kept) for name in options['workload']}
+
+        # Don't hold the SQLite file open while the server writes to it
+        connections.close_all()
+        report = {
+            'project': 'api_project',
+            'commit': git_commit(settings.BASE_DIR),
+            'time': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'books': len(book_ids),
+            'clients': options['clients'],
+            'requests_per_client': options['requests'],
+            'seed': options['seed'],
+            'workloads': {},
+        }
+        if options['base_url']:
+            self._run_all(options['base_url'].rstrip('/'), workloads, spare, headers, options, report)
+        else:
+            with LocalServer(settings.BASE_DIR / 'manage.py') as base_url:
+                self._run_all(base_url, workloads, spare, headers, options, report)
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(report, output, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+    def _run_all(self, base_url, workloads, spare, headers, options, report):
+        clients = options['clients']
+        for name, operations in workloads.items():
+            # The in-process deletes are rolled back, so any spare book will do
+            queries = self._queries_per_request(operations(spare[:1]), headers, options['seed'])
+            results = asyncio.run(run_mix(
+                base_url, lambda index: operations(spare[index::clients]), clients, options['requests'],
+                seed=options['seed'], headers=headers,
+            ))
+            sent = {label: results[label].requests for label in queries if label in results}
+            if sum(sent.values()):
+                total = sum(queries[label] * count for label, count in sent.items())
+                queries['all'] = round(total / sum(sent.values()), 2)
+            report['workloads'][name] = {
+                label: dict(result.as_dict(), queries_per_request=queries.get(label))
+                for label, result in sorted(results.items())
+            }
+            self._print(name, report['workloads'][name])
+
+    def _print(self, workload, rows):
+        self.stdout.write(self.style.MIGRATE_HEADING(f'{workload} workload'))
+        self.stdout.write(
+            f"  {'operation':<12}  {'requests':>8}  {'req/s':>8}  {'p50':>9}  {'p95':>9}  {'p99':>9}  "
+            f"{'queries':>7}  {'errors':>6}"
+        )
+        for label, row in rows.items():
+            queries = '' if row['queries_per_request'] is None else f"{row['queries_per_request']:.1f}"
+            self.stdout.write(
+                f"  {label:<12}  {row['requests']:>8}  {row['requests_per_second']:>8.1f}  "
+                f"{row['p50_ms']:>7.1f}ms  {row['p95_ms']:>7.1f}ms  {row['p99_ms']:>7.1f}ms  "
+                f"{queries:>7}  {row['errors']:>6}"
+            )
+
+    # ---------------------------------------------------
+    # Dataset
+    # ---------------------------------------------------
+    def _load_dataset(self, size, seed):
+        rng = random.Random(seed)
+        authors = [f'{rng.choice(WORDS).title()} {index}' for index in range(max(1, size // 20))]
+        started = time.monotonic()
+        with transaction.atomic():
+            Book.objects.all().delete()
+            Book.objects.bulk_create(
+                (
+                    Book(
+                        title=' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 4))).title(),
+                        author=rng.choice(authors),
+                    )
+                    for _ in range(size)
+                ),
+                batch_size=10_000
+            )
+        self.stdout.write(f'Loaded {size:,} books in {time.monotonic() - started:.1f}s')
+
+    def _auth_headers(self):
+        # The router only accepts token authentication for writes
+        user, _ = get_user_model().objects.get_or_create(username=BENCH_USER)
+        token, _ = Token.objects.get_or_create(user=user)
+        return {
+            'Content-Type': 'application/json',
+            'Authorization': f'Token {token.key}',
+        }
+
+    # ---------------------------------------------------
+    # Workloads
+    # ---------------------------------------------------
+    def _operations(self, workload, kept, deletes):
+        # (label, weight, build(rng) -> (method, path, body)); each
+        # delete takes the next of `deletes`, and the operation drops
+        # out of the mix once they are used up
+        # Neither list endpoint is paginated: with the 100k and 1m
+        # datasets every list request returns the whole table.
+        def body(rng):
+            return json.dumps({
+                'title': ' '.join(rng.choice(WORDS) for _ in range(2)).title(),
+                'author': f'{rng.choice(WORDS).title()} {rng.randint(0, 999)}',
+            }).encode()
+
+        deletes = iter(deletes)
+
+        def delete(rng):
+            book_id = next(deletes, None)
+            return None if book_id is None else ('DELETE', f'/api/books_all/{book_id}/', None)
+
+        operations = [
+            ('list', 10, lambda rng: ('GET', '/api/books/', None)),
+            ('router_list', 10, lambda rng: ('GET', '/api/books_all/', None)),
+            ('detail', 80, lambda rng: ('GET', f'/api/books_all/{rng.choice(kept)}/', None)),
+        ]
+        if workload == 'mixed':
+            operations += [
+                ('create', 10, lambda rng: ('POST', '/api/books_all/', body(rng))),
+                ('update', 8, lambda rng: ('PATCH', f'/api/books_all/{rng.choice(kept)}/', body(rng))),
+                ('delete', 2, delete),
+            ]
+        return operations
+
+    def _queries_per_request(self, operations, headers, seed):
+        # Runs one request per operation in-process and rolls back
+        # whatever it changed.
+        rng = random.Random(seed)
+        client = Client(HTTP_HOST='localhost', HTTP_AUTHORIZATION=headers['Authorization'])
+        queries = {}
+        try:
+            with transaction.atomic():
+                for label, _, build in operations:
+                    request = build(rng)
+                    if request is None:
+                        continue
+                    method, path, body = request
+                    with CaptureQueriesContext(connection) as captured:
+                        client.generic(method, path, body or b'', content_type='application/json')
+                    queries[label] = len(captured)
+                raise Rollback
+        except Rollback:
+            pass
+        return queries
@@ -1,3 +1,151 @@
-from django.test import TestCase
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+from contextlib import closing
+from io import StringIO
+from unittest import mock, skipIf
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from . import router
+from .messagepack import msgpack
+from .models import Book
+from .router import PIN_COOKIE, ReplicaPinningMiddleware, ReplicaRouter, use_primary
+
+
+@skipIf(msgpack is None, "msgpack is not installed")
+class MessagePackTestCase(APITestCase):
+    """
+    Test suite for the MessagePack renderer and parser.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="password123")
+        self.token = Token.objects.create(user=self.user)
+        self.book = Book.objects.create(title="Foundation", author="Isaac Asimov")
+
+    def test_responses_match_json(self):
+        for url in [reverse("book-list"), reverse("book_all-list"), reverse("book_all-detail", args=[self.book.id])]:
+            as_json = self.client.get(url, HTTP_ACCEPT="application/json")
+            as_msgpack = self.client.get(url, HTTP_ACCEPT="application/msgpack")
+
+            self.assertEqual(as_msgpack["Content-Type"], "application/msgpack")
+            self.assertEqual(msgpack.unpackb(as_msgpack.content), json.loads(as_json.content))
+
+        response = self.client.get(reverse("book_all-detail", args=[self.book.id]) + "?format=msgpack")
+        self.assertEqual(msgpack.unpackb(response.content)["title"], "Foundation")
+
+    def test_create_from_msgpack(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        response = self.client.post(
+            reverse("book_all-list"), msgpack.packb({"title": "I, Robot", "author": "Isaac Asimov"}),
+            content_type="application/msgpack", HTTP_ACCEPT="application/msgpack"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(msgpack.unpackb(response.content)["title"], "I, Robot")
+        self.assertTrue(Book.objects.filter(title="I, Robot").exists())
+
+    def test_invalid_msgpack_is_rejected(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        response = self.client.post(reverse("book_all-list"), b"\xc1", content_type="application/msgpack")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(DATABASE_REPLICAS=["replica"], DATABASE_PIN_SECONDS=5)
+class ReplicaRouterTestCase(SimpleTestCase):
+    """
+    Test suite for the read/write router and read-your-writes pinning.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.router = ReplicaRouter()
+        token = router._state.set(None)
+        self.addCleanup(router._state.reset, token)
+
+    def test_reads_go_to_replica_writes_to_primary(self):
+        self.assertEqual(self.router.db_for_read(Book), "replica")
+        self.assertEqual(self.router.db_for_write(Book), "default")
+        self.assertFalse(self.router.allow_migrate("replica", "api"))
+
+        with override_settings(DATABASE_REPLICAS=[]):
+            self.assertEqual(self.router.db_for_read(Book), "default")
+
+    def test_reads_stay_on_primary_for_the_window_after_a_write(self):
+        with mock.patch("api.router.time.time", return_value=1000.0):
+            self.router.db_for_write(Book)
+            self.assertEqual(self.router.db_for_read(Book), "default")
+        with mock.patch("api.router.time.time", return_value=1006.0):
+            self.assertEqual(self.router.db_for_read(Book), "replica")
+
+    def test_use_primary(self):
+        with use_primary():
+            self.assertEqual(self.router.db_for_read(Book), "default")
+        self.assertEqual(self.router.db_for_read(Book), "replica")
+
+    def _request(self, method="get", write=False, **extra):
+        reads = []
+
+        def view(request):
+            if write:
+                self.router.db_for_write(Book)
+            reads.append(self.router.db_for_read(Book))
+            return HttpResponse()
+
+        request = getattr(RequestFactory(), method)("/api/books_all/", **extra)
+        response = ReplicaPinningMiddleware(view)(request)
+        return reads[0], response
+
+    def test_unsafe_requests_read_from_primary(self):
+        self.assertEqual(self._request()[0], "replica")
+        self.assertEqual(self._request("post")[0], "default")
+
+    def test_client_is_pinned_after_its_write(self):
+        read, response = self._request("post", write=True)
+        self.assertEqual(response.cookies[PIN_COOKIE]["max-age"], 5)
+
+        # Cookie clients
+        self.assertEqual(self._request(HTTP_COOKIE=f"{PIN_COOKIE}=1")[0], "default")
+        self.assertEqual(self._request()[0], "replica")
+
+    def test_token_client_is_pinned_after_its_write(self):
+        self._request("post", write=True, HTTP_AUTHORIZATION="Token abc")
+
+        self.assertEqual(self._request(HTTP_AUTHORIZATION="Token abc")[0], "default")
+        self.assertEqual(self._request(HTTP_AUTHORIZATION="Token other")[0], "replica")
+        self.assertNotIn(PIN_COOKIE, self._request(HTTP_AUTHORIZATION="Token abc")[1].cookies)
+
+
+class RefreshReplicaCommandTestCase(TransactionTestCase):
+    """
+    Test suite for `manage.py refresh_replica`. Runs outside a test
+    transaction, like the command itself: the backup can't read the
+    in-memory test database while a transaction holds it.
+    """
+
+    def test_copies_the_primary(self):
+        Book.objects.create(title="Foundation", author="Isaac Asimov")
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "replica.sqlite3")
+
+        call_command("refresh_replica", "--to", path, stdout=StringIO())
+
+        with closing(sqlite3.connect(path)) as replica:
+            self.assertEqual(replica.execute("SELECT title FROM api_book").fetchall(), [("Foundation",)])
+        self.assertEqual(os.listdir(directory), ["replica.sqlite3"])
+
+    def test_requires_a_replica(self):
+        with self.assertRaisesMessage(CommandError, "No replicas configured"):
+            call_command("refresh_replica", stdout=StringIO())
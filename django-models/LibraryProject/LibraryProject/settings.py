@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -42,7 +43,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'relationship_app.middleware.QueryProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    # Before anything that reads the database
+    'relationship_app.router.ReplicaPinningMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -81,6 +85,20 @@ DATABASES = {
     }
 }
 
+# Reads go to DATABASE_REPLICAS, writes to `default` (see relationship_app/router.py).
+# Locally, DJANGO_DB_REPLICA=1 adds a stand-in replica: a copy of
+# db.sqlite3 kept fresh by `python manage.py refresh_replica --interval 2`.
+if os.environ.get('DJANGO_DB_REPLICA'):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.replica.sqlite3',
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['relationship_app.router.ReplicaRouter']
+# After a client's write, its reads stay on the primary this long (seconds)
+DATABASE_PIN_SECONDS = 5
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -122,3 +140,31 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# SQL profiling (relationship_app/middleware.py)
+# A query shape repeated this many times in one request is logged as a
+# probable N+1 loop; per-view totals are logged every INTERVAL seconds.
+# Development only: the X-SQL-* headers expose internals.
+SQL_PROFILING_ENABLED = DEBUG
+SQL_PROFILING_N_PLUS_ONE = 5
+SQL_PROFILING_SUMMARY_INTERVAL = 60  # seconds
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'sql_profile': {
+            'class': 'logging.FileHandler',
+            'filename': BASE_DIR / 'sql_profile.log',
+            'delay': True,
+        },
+    },
+    'loggers': {
+        'relationship_app.sql': {
+            'handlers': ['sql_profile'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
@@ -0,0 +1,196 @@
+import json
+import logging
+import re
+import sys
+import sysconfig
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.template.base import Node
+
+logger = logging.getLogger('relationship_app.sql')
+
+# Frames from these directories are never reported as the call site
+LIBRARY_PATHS = tuple(
+    str(Path(path).resolve())
+    for path in {
+        str(Path(django.__file__).parent),
+        sysconfig.get_paths()['stdlib'],
+        sysconfig.get_paths()['purelib'],
+        sysconfig.get_paths()['platlib'],
+        __file__,
+    }
+)
+
+# "IN (%s, %s, %s)" -> "IN (...)", so batches of any size share a shape
+IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+
+
+def query_shape(sql):
+    # Django passes parameters separately, so the SQL string already is
+    # the query with its values replaced by placeholders.
+    return IN_LIST.sub('IN (...)', sql)
+
+
+def find_origin():
+    """Return (template, call_site) for the query being executed.
+
+    `template` is "name:line" of the innermost template node being
+    rendered, if any; `call_site` is "file:line (function)" of the
+    innermost frame outside Django, the standard library and
+    installed packages: the project code that triggered the query.
+    """
+    template = call_site = None
+    frame = sys._getframe(1)
+    while frame is not None and call_site is None:
+        code = frame.f_code
+        if template is None and code.co_name == 'render_annotated':
+            node = frame.f_locals.get('self')
+            if isinstance(node, Node) and getattr(node, 'origin', None) is not None:
+                template = f'{node.origin.template_name}:{node.token.lineno}'
+        if not code.co_filename.startswith(LIBRARY_PATHS) and not code.co_filename.startswith('<'):
+            call_site = f'{code.co_filename}:{frame.f_lineno} ({code.co_name})'
+        frame = frame.f_back
+    return template, call_site
+
+
+# ---------------------------------------------------------
+# RequestProfile
+# ---------------------------------------------------------
+# Collects the queries of one request. Installed as an
+# execute_wrapper on every database connection, so it sees each
+# query Django runs, including the ones issued while rendering the
+# template.
+class RequestProfile:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes = Counter()
+        self.origins = {}  # shape -> (template, call_site) of its first repeat
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+            shape = query_shape(sql)
+            self.shapes[shape] += 1
+            # Walking the stack is only worth it once a shape repeats
+            if self.shapes[shape] == 2:
+                self.origins[shape] = find_origin()
+
+    def repeated(self, threshold):
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+
+# ---------------------------------------------------------
+# Summary
+# ---------------------------------------------------------
+# Per-view totals shared by all requests of the process, written to
+# the `relationship_app.sql` logger every SQL_PROFILING_SUMMARY_INTERVAL
+# seconds and then reset.
+class Summary:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.started = time.monotonic()
+        self.views = {}
+
+    def add(self, view, profile, flagged):
+        with self.lock:
+            stats = self.views.setdefault(view, {
+                'requests': 0, 'queries': 0, 'sql_ms': 0.0, 'max_queries': 0, 'n_plus_one': Counter(),
+            })
+            stats['requests'] += 1
+            stats['queries'] += profile.count
+            stats['sql_ms'] += profile.seconds * 1000
+            stats['max_queries'] = max(stats['max_queries'], profile.count)
+            for event in flagged:
+                stats['n_plus_one'][event['template'] or event['call_site'] or event['shape']] += 1
+
+    def flush_if_due(self, interval):
+        with self.lock:
+            if not self.views or time.monotonic() - self.started < interval:
+                return None
+            views, period = self.views, time.monotonic() - self.started
+            self.reset()
+
+        summary = {'event': 'sql_summary', 'seconds': round(period, 1), 'views': {}}
+        for view, stats in sorted(views.items(), key=lambda item: -item[1]['sql_ms']):
+            summary['views'][view] = {
+                'requests': stats['requests'],
+                'avg_queries': round(stats['queries'] / stats['requests'], 1),
+                'max_queries': stats['max_queries'],
+                'avg_sql_ms': round(stats['sql_ms'] / stats['requests'], 2),
+                'n_plus_one': dict(stats['n_plus_one']),
+            }
+        logger.info(json.dumps(summary))
+        return summary
+
+
+summary = Summary()
+
+
+# ---------------------------------------------------------
+# QueryProfilingMiddleware
+# ---------------------------------------------------------
+# Records the number of queries, the total SQL time and the repeated
+# query shapes (same SQL, different parameters) of every request.
+# - A shape run SQL_PROFILING_N_PLUS_ONE times or more in one request
+#   is logged as a probable N+1 loop (warning), with the view name,
+#   the template line and the project code that triggered it.
+# - Per-view totals are logged as a summary periodically.
+# - Adds X-SQL-Queries / X-SQL-Time headers to the response.
+# Enabled by SQL_PROFILING_ENABLED, which defaults to DEBUG: the
+# headers and logged call sites must not reach production clients.
+# Put it first in MIDDLEWARE so the queries of the other
+# middleware (sessions, auth) are counted too.
+class QueryProfilingMiddleware:
+    def __init__(self, get_response):
+        if not getattr(settings, 'SQL_PROFILING_ENABLED', settings.DEBUG):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.threshold = getattr(settings, 'SQL_PROFILING_N_PLUS_ONE', 5)
+        self.interval = getattr(settings, 'SQL_PROFILING_SUMMARY_INTERVAL', 60)
+
+    def __call__(self, request):
+        profile = RequestProfile()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(profile))
+            response = self.get_response(request)
+
+        view = self.get_view_name(request)
+        flagged = []
+        for shape, count in profile.repeated(self.threshold):
+            template, call_site = profile.origins.get(shape, (None, None))
+            event = {
+                'event': 'n_plus_one', 'view': view, 'path': request.path, 'count': count,
+                'template': template, 'call_site': call_site, 'shape': shape,
+            }
+            flagged.append(event)
+            logger.warning(json.dumps(event))
+
+        response['X-SQL-Queries'] = str(profile.count)
+        response['X-SQL-Time'] = f'{profile.seconds * 1000:.2f}ms'
+        summary.add(view, profile, flagged)
+        summary.flush_if_due(self.interval)
+        return response
+
+    @staticmethod
+    def get_view_name(request):
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return '(unresolved)'
+        return match.view_name or match._func_path
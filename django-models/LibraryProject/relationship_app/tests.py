@@ -1,3 +1,177 @@
-from django.test import TestCase
+import json
+from collections import Counter
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from . import router
+from .middleware import Summary, query_shape
+from .models import Author, Book, Librarian, Library
+from .router import PIN_COOKIE, ReplicaPinningMiddleware, ReplicaRouter
+
+
+@override_settings(SQL_PROFILING_ENABLED=True)
+class QueryProfilingMiddlewareTestCase(TestCase):
+    """
+    Test suite for QueryProfilingMiddleware: query counting and
+    N+1 detection on the book list and library detail pages.
+    """
+
+    def setUp(self):
+        self.library = Library.objects.create(name="Central")
+        for index in range(6):
+            author = Author.objects.create(name=f"Author {index}")
+            self.library.books.add(Book.objects.create(title=f"Book {index}", author=author))
+
+    def test_list_books_flags_author_lookup(self):
+        with self.assertLogs("relationship_app.sql", "WARNING") as logs:
+            response = self.client.get(reverse("list_books"))
+
+        self.assertEqual(response["X-SQL-Queries"], "7")  # books + one author per book
+        event = json.loads(logs.records[0].getMessage())
+        self.assertEqual(event["view"], "list_books")
+        self.assertEqual(event["count"], 6)
+        self.assertEqual(event["template"], "relationship_app/list_books.html:12")
+        self.assertIn("views.py", event["call_site"])
+        self.assertIn("relationship_app_author", event["shape"])
+
+    def test_library_detail_flags_author_lookup(self):
+        with self.assertLogs("relationship_app.sql", "WARNING") as logs:
+            self.client.get(reverse("library_detail", args=[self.library.pk]))
+
+        event = json.loads(logs.records[0].getMessage())
+        self.assertEqual(event["view"], "library_detail")
+        self.assertEqual(event["template"], "relationship_app/library_detail.html:13")
+
+    @override_settings(SQL_PROFILING_N_PLUS_ONE=10)
+    def test_below_threshold_is_not_flagged(self):
+        with self.assertNoLogs("relationship_app.sql", "WARNING"):
+            response = self.client.get(reverse("list_books"))
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(SQL_PROFILING_ENABLED=False)
+    def test_disabled_middleware_adds_no_headers(self):
+        response = self.client.get(reverse("list_books"))
+        self.assertNotIn("X-SQL-Queries", response)
+
+    def test_query_shape_ignores_in_list_length(self):
+        self.assertEqual(
+            query_shape('SELECT 1 FROM t WHERE id IN (%s, %s, %s)'),
+            query_shape('SELECT 1 FROM t WHERE id IN (%s)'),
+        )
+
+    def test_summary_totals_per_view(self):
+        summary = Summary()
+        summary.started -= 120
+
+        class Profile:
+            count, seconds = 7, 0.01
+
+        flagged = [{"template": "relationship_app/list_books.html:12", "call_site": None, "shape": ""}]
+        summary.add("list_books", Profile, flagged)
+        summary.add("list_books", Profile, [])
+        with self.assertLogs("relationship_app.sql", "INFO"):
+            data = summary.flush_if_due(60)
+
+        stats = data["views"]["list_books"]
+        self.assertEqual(stats["requests"], 2)
+        self.assertEqual(stats["avg_queries"], 7)
+        self.assertEqual(stats["n_plus_one"], {"relationship_app/list_books.html:12": 1})
+        self.assertIsNone(summary.flush_if_due(60))
+
+
+class GenerateLibraryDataCommandTestCase(TestCase):
+    """
+    Test suite for `manage.py generate_library_data`.
+    """
+
+    def _generate(self, *args):
+        call_command("generate_library_data", *args, stdout=StringIO())
+
+    def test_generates_requested_rows(self):
+        Author.objects.create(name="Existing")
+        self._generate("--authors", "50", "--books", "2000", "--libraries", "20", "--library-books", "30")
+
+        self.assertEqual(Author.objects.count(), 51)
+        self.assertEqual(Book.objects.count(), 2000)
+        self.assertEqual(Library.objects.count(), 20)
+        self.assertEqual(Librarian.objects.count(), 20)
+        self.assertFalse(Book.objects.filter(author__name="Existing").exists())
+
+        # Every library has a librarian and at least one book
+        self.assertFalse(Library.objects.filter(librarian__isnull=True).exists())
+        self.assertFalse(Library.objects.filter(books__isnull=True).exists())
+
+    def test_distributions_are_skewed(self):
+        self._generate("--authors", "100", "--books", "5000", "--libraries", "50", "--library-books", "40")
+
+        books_per_author = sorted(Counter(Book.objects.values_list("author_id", flat=True)).values())
+        self.assertGreater(books_per_author[-1], 10 * books_per_author[len(books_per_author) // 2])
+
+        sizes = sorted(library.books.count() for library in Library.objects.all())
+        self.assertGreater(sizes[-1], 5 * sizes[len(sizes) // 2])
+
+        # Popular books are held by several libraries
+        holders = Counter(Library.books.through.objects.values_list("book_id", flat=True))
+        self.assertGreater(max(holders.values()), 5)
+
+    def test_same_seed_same_data(self):
+        self._generate("--authors", "10", "--books", "100", "--libraries", "5", "--seed", "7")
+        first = list(Book.objects.order_by("id").values_list("title", "author_id"))
+        Book.objects.all().delete()
+        Author.objects.all().delete()
+        Library.objects.all().delete()
+
+        self._generate("--authors", "10", "--books", "100", "--libraries", "5", "--seed", "7")
+        second = list(Book.objects.order_by("id").values_list("title", "author_id"))
+        self.assertEqual(first, second)
+
+    def test_resets_sequences_after_explicit_ids(self):
+        with mock.patch.object(connection.ops, "sequence_reset_sql", return_value=[]) as reset:
+            self._generate("--authors", "10", "--books", "100", "--libraries", "5")
+
+        models = reset.call_args.args[1]
+        self.assertEqual(set(models), {Author, Book, Library, Librarian, Library.books.through})
+        # ORM inserts keep working after the explicitly numbered rows
+        author = Author.objects.create(name="After")
+        self.assertGreater(author.pk, Author.objects.exclude(pk=author.pk).latest("pk").pk)
+
+
+@override_settings(DATABASE_REPLICAS=["replica"], DATABASE_PIN_SECONDS=5)
+class ReplicaRouterTestCase(SimpleTestCase):
+    """
+    Test suite for the read/write router and read-your-writes pinning.
+    """
+
+    def setUp(self):
+        self.router = ReplicaRouter()
+        token = router._state.set(None)
+        self.addCleanup(router._state.reset, token)
+
+    def test_reads_stay_on_primary_for_the_window_after_a_write(self):
+        self.assertEqual(self.router.db_for_read(Book), "replica")
+        with mock.patch("relationship_app.router.time.time", return_value=1000.0):
+            self.assertEqual(self.router.db_for_write(Book), "default")
+            self.assertEqual(self.router.db_for_read(Book), "default")
+        with mock.patch("relationship_app.router.time.time", return_value=1006.0):
+            self.assertEqual(self.router.db_for_read(Book), "replica")
+
+    def test_client_is_pinned_after_its_write(self):
+        def view(request):
+            if request.method == "POST":
+                self.router.db_for_write(Book)
+            return HttpResponse(self.router.db_for_read(Book))
+
+        middleware = ReplicaPinningMiddleware(view)
+        response = middleware(RequestFactory().post("/books/"))
+        self.assertEqual(response.cookies[PIN_COOKIE]["max-age"], 5)
+
+        pinned = middleware(RequestFactory().get("/books/", HTTP_COOKIE=f"{PIN_COOKIE}=1"))
+        self.assertEqual(pinned.content, b"default")
+        self.assertEqual(middleware(RequestFactory().get("/books/")).content, b"replica")
 
-# Create your tests here.